@@ -7,6 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from routers.oauth import router as oauth_router
 from routers.protection.antinuke import router as antinuke_router
+from routers.protection.gate import router as gate_router
 
 app = FastAPI(title="asdfgh", version="1.0.0")
 
@@ -19,4 +20,5 @@ app.add_middleware(
 )
 
 app.include_router(oauth_router)
-app.include_router(antinuke_router)
\ No newline at end of file
+app.include_router(antinuke_router)
+app.include_router(gate_router)
\ No newline at end of file
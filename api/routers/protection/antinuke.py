@@ -2,10 +2,10 @@
 api/routers/protection/antinuke.py
 """
 
-from fastapi import APIRouter as Router, Depends
+from fastapi import APIRouter as Router, Depends, HTTPException, Query
 
 from helpers.database import Database
-from features.protection.antinuke import Modules, Punishment
+from features.protection.antinuke import Modules, Punishment, Trusted
 from api.middleware.auth import authentication, get_current_user
 
 import dotenv
@@ -56,7 +56,7 @@ async def activate_antinuke(
     guild: int,
     module: Modules,
     punishment: Punishment,
-    threshold: str = "3",
+    threshold: int = Query(3, ge=1, le=1000),
     user: dict = Depends(get_current_user),
 ):
     await db.execute(
@@ -86,7 +86,7 @@ async def update_antinuke(
     guild: int,
     module: Modules,
     punishment: Punishment,
-    threshold: str = "3",
+    threshold: int = Query(3, ge=1, le=1000),
     user: dict = Depends(get_current_user),
 ):
     await db.execute(
@@ -123,4 +123,148 @@ async def deactivate_antinuke(
         (guild, module.value),
     )
 
-    return {"message": f"Antinuke deactivated for guild {guild}, module {module.value}"}
\ No newline at end of file
+    return {"message": f"Antinuke deactivated for guild {guild}, module {module.value}"}
+
+
+@router.get("/{guild}/whitelist", summary="Get whitelisted users and roles", status_code=200)
+@authentication.require_permission(manage_guild=True)
+async def get_whitelist(guild: int, user: dict = Depends(get_current_user)):
+    result = await db.fetchall(
+        """
+        SELECT target_id, type
+        FROM antinuke_whitelist
+        WHERE guild_id = ?
+        """,
+        (guild,),
+    )
+
+    return {
+        "guild_id": guild,
+        "whitelist": [
+            {
+                "target_id": row["target_id"],
+                "type":      row["type"],
+            }
+            for row in result
+        ],
+    }
+
+
+@router.post("/{guild}/whitelist", summary="Whitelist a user or role", status_code=200)
+@authentication.is_server_owner()
+async def add_whitelist(
+    guild: int,
+    target: int,
+    type: Trusted = Trusted.USER,
+    user: dict = Depends(get_current_user),
+):
+    """Whitelisting is owner-only — trusted actors are never punished."""
+    await db.execute(
+        """
+        INSERT INTO antinuke_whitelist (guild_id, target_id, type)
+        VALUES (?, ?, ?)
+        ON CONFLICT (guild_id, target_id) DO UPDATE SET
+            type = excluded.type
+        """,
+        (guild, target, type.value),
+    )
+
+    return {"message": f"Whitelisted {type.value} {target} for guild {guild}"}
+
+
+@router.delete("/{guild}/whitelist", summary="Remove a user or role from the whitelist", status_code=200)
+@authentication.is_server_owner()
+async def remove_whitelist(
+    guild: int,
+    target: int,
+    user: dict = Depends(get_current_user),
+):
+    await db.execute(
+        """
+        DELETE FROM antinuke_whitelist
+        WHERE guild_id = ? AND target_id = ?
+        """,
+        (guild, target),
+    )
+
+    return {"message": f"Removed {target} from the whitelist for guild {guild}"}
+
+
+@router.get("/{guild}/policies", summary="Get escalation steps for a module", status_code=200)
+@authentication.require_permission(manage_guild=True)
+async def get_policies(guild: int, module: Modules, user: dict = Depends(get_current_user)):
+    result = await db.fetchall(
+        """
+        SELECT threshold, punishment
+        FROM antinuke_policies
+        WHERE guild_id = ? AND module = ?
+        ORDER BY threshold
+        """,
+        (guild, module.value),
+    )
+
+    return {
+        "guild_id": guild,
+        "module": module.value,
+        "steps": [
+            {
+                "threshold":  row["threshold"],
+                "punishment": row["punishment"],
+            }
+            for row in result
+        ],
+    }
+
+
+@router.post("/{guild}/policies", summary="Add an escalation step to a module", status_code=200)
+@authentication.require_permission(manage_guild=True)
+async def add_policy(
+    guild: int,
+    module: Modules,
+    threshold: int,
+    punishment: Punishment,
+    user: dict = Depends(get_current_user),
+):
+    if threshold < 1:
+        raise HTTPException(status_code=422, detail="Threshold must be at least 1")
+
+    await db.execute(
+        """
+        INSERT INTO antinuke_policies (guild_id, module, threshold, punishment)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (guild_id, module, threshold) DO UPDATE SET
+            punishment = excluded.punishment
+        """,
+        (guild, module.value, threshold, punishment.value),
+    )
+
+    return {
+        "message": (
+            f"Escalation step added for guild {guild}, module {module.value}, "
+            f"punishment {punishment.value}, threshold {threshold}"
+        )
+    }
+
+
+@router.delete("/{guild}/policies", summary="Remove an escalation step from a module", status_code=200)
+@authentication.require_permission(manage_guild=True)
+async def remove_policy(
+    guild: int,
+    module: Modules,
+    threshold: int,
+    user: dict = Depends(get_current_user),
+):
+    await db.execute(
+        """
+        DELETE FROM antinuke_policies
+        WHERE guild_id = ? AND module = ? AND threshold = ?
+        """,
+        (guild, module.value, threshold),
+    )
+
+    return {
+        "message": (
+            f"Escalation step removed for guild {guild}, module {module.value}, "
+            f"threshold {threshold}"
+        )
+    }
\ No newline at end of file
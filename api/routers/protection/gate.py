@@ -0,0 +1,92 @@
+"""
+api/routers/protection/gate.py
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter as Router, Depends, HTTPException
+
+from helpers.database import Database
+from features.protection.models import Punishment
+from features.protection.rules import GateConfig
+from api.middleware.auth import authentication, get_current_user
+
+import dotenv
+
+dotenv.load_dotenv()
+
+router = Router(prefix="/protection/gate", tags=["Protection"])
+db = Database(dotenv.get_key(dotenv.find_dotenv(), "DATABASE_URL"))
+
+
+@router.get("/{guild}", summary="Get join gate settings for a guild", status_code=200)
+@authentication.require_permission(manage_guild=True)
+async def get_gate(guild: int, user: dict = Depends(get_current_user)):
+    config = await GateConfig.fetch(db, guild)
+    if not config:
+        return {"message": f"Join gate is not enabled for guild {guild}"}
+
+    return {"guild_id": guild, **config.to_dict()}
+
+
+@router.post("/{guild}", summary="Enable the join gate for a guild", status_code=200)
+@authentication.require_permission(manage_guild=True)
+async def enable_gate(
+    guild: int,
+    age: Optional[str] = None,
+    avatar: bool = False,
+    action: Punishment = Punishment.KICK,
+    similar: int = 0,
+    duplicates: int = 0,
+    dry_run: bool = False,
+    user: dict = Depends(get_current_user),
+):
+    try:
+        config = GateConfig(age, avatar, action, similar, duplicates, dry_run)
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+
+    await config.save(db, guild)
+
+    return {"message": f"Join gate enabled for guild {guild}", **config.to_dict()}
+
+
+@router.put("/{guild}", summary="Update join gate settings for a guild", status_code=200)
+@authentication.require_permission(manage_guild=True)
+async def update_gate(
+    guild: int,
+    age: Optional[str] = None,
+    avatar: Optional[bool] = None,
+    action: Optional[Punishment] = None,
+    similar: Optional[int] = None,
+    duplicates: Optional[int] = None,
+    dry_run: Optional[bool] = None,
+    user: dict = Depends(get_current_user),
+):
+    existing = await GateConfig.fetch(db, guild)
+    if not existing:
+        raise HTTPException(status_code=404, detail=f"Join gate is not enabled for guild {guild}")
+
+    try:
+        config = existing.merge(
+            age=age,
+            avatar=avatar,
+            action=action,
+            similar=similar,
+            duplicates=duplicates,
+            dry_run=dry_run,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+
+    await config.save(db, guild)
+
+    return {"message": f"Join gate updated for guild {guild}", **config.to_dict()}
+
+
+@router.delete("/{guild}", summary="Disable the join gate for a guild", status_code=200)
+@authentication.require_permission(manage_guild=True)
+async def disable_gate(guild: int, user: dict = Depends(get_current_user)):
+    await GateConfig.delete(db, guild)
+
+    return {"message": f"Join gate disabled for guild {guild}"}
\ No newline at end of file
@@ -1,14 +1,24 @@
-from typing import Optional
+from typing import Dict, Optional
 
 from discord.gateway import DiscordWebSocket
 from discord.ext import commands
+from time import monotonic
 
+import asyncio
 import discord
 import logging
 import aiohttp
+import yarl
 
+from helpers.cases import CaseLog
+from helpers.chunking import ChunkScheduler
+from helpers.cluster import ClusterClient
 from helpers.context import Context
+from helpers.counters import GuildCounters
 from helpers.database import Database
+from helpers.identify import IdentifyBuckets
+from helpers.intents import feature_intents, member_cache_flags
+from helpers.scheduler import Scheduler
 
 import config
 
@@ -117,11 +127,11 @@ class Bot(commands.AutoShardedBot):
     async def get_context(self, message, *, cls=Context):
         return await super().get_context(message, cls=cls)
 
-    def __init__(self) -> None:
+    def __init__(self, **options) -> None:
         allowed_mentions = discord.AllowedMentions(
             roles=False, everyone=False, users=True
         )
-        intents = discord.Intents.all()
+        intents = feature_intents(config.Settings.features)
 
         super().__init__(
             command_prefix=self.get_prefix,
@@ -130,11 +140,90 @@ class Bot(commands.AutoShardedBot):
             heartbeat_timeout=150.0,
             allowed_mentions=allowed_mentions,
             intents=intents,
-            enable_debug_events=True,
-            help_command=None
+            member_cache_flags=member_cache_flags(config.Settings.member_cache, intents),
+            max_messages=config.Settings.message_cache,
+            enable_debug_events=config.Settings.debug_events,
+            help_command=None,
+            **options,
         )
 
         self.db = Database(config.Settings.db_path)
+        self.scheduler = Scheduler(
+            self.db, ready=self.wait_until_ready, owns=self.owns_guild
+        )
+        self.cases = CaseLog(self.db)
+        # set by the cluster launcher, None when running as a single process
+        self.ipc: Optional[ClusterClient] = None
+        self.counters = GuildCounters()
+        self.identify = IdentifyBuckets()
+        self.shard_launched: Dict[int, float] = {}
+        self.shard_ready: Dict[int, float] = {}
+        self.chunker = ChunkScheduler(
+            self,
+            concurrency=config.Settings.chunk_concurrency,
+            idle=config.Settings.chunk_idle,
+        )
+
+    def owns_guild(self, guild_id: Optional[int]) -> bool:
+        """Whether *guild_id* is on one of this process's shards, guildless work goes to shard 0"""
+        if self.shard_ids is None:
+            return True
+
+        if guild_id is None:
+            return 0 in self.shard_ids
+
+        return (guild_id >> 22) % self.shard_count in self.shard_ids
+
+    async def launch_shards(self) -> None:
+        """Launch shards one bucket per identify slot, at most max_concurrency at once"""
+        if self.is_closed():
+            return
+
+        shard_count, gateway_url, limits = await self.http.get_bot_gateway()
+        if self.shard_count is None:
+            self.shard_count = shard_count
+        self._connection.shard_count = self.shard_count
+
+        shard_ids = self.shard_ids or range(self.shard_count)
+        self._connection.shard_ids = shard_ids
+
+        self.identify.max_concurrency = max(1, limits["max_concurrency"])
+        gateway = yarl.URL(gateway_url)
+        logger.info(
+            f"Launching {len(shard_ids)} shards, {self.identify.max_concurrency} at a time "
+            f"({limits['remaining']} session starts left)"
+        )
+
+        started = monotonic()
+        self.shard_launched = dict.fromkeys(shard_ids, started)
+
+        async def launch(bucket):
+            for shard_id in bucket:
+                await self.launch_shard(gateway, shard_id, initial=shard_id == shard_ids[0])
+
+        await asyncio.gather(*(launch(bucket) for bucket in self.identify.split(shard_ids)))
+
+    async def before_identify_hook(self, shard_id: Optional[int], *, initial: bool = False) -> None:
+        """Wait for a free identify slot in the shard's bucket, shared by every cluster"""
+        if self.ipc:
+            delay = await self.ipc.reserve_identify(shard_id)
+        else:
+            delay = self.identify.reserve(shard_id)
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def on_shard_ready(self, shard_id: int) -> None:
+        launched = self.shard_launched.pop(shard_id, None)
+        if launched is None:
+            return
+
+        self.shard_ready[shard_id] = monotonic() - launched
+        logger.info(f"Shard {shard_id} ready in {self.shard_ready[shard_id]:.1f}s")
+        if not self.shard_launched:
+            logger.info(
+                f"All {len(self.shard_ready)} shards ready in {max(self.shard_ready.values()):.1f}s"
+            )
 
     async def get_prefix(self, message):
         if not message.guild:
@@ -153,6 +242,10 @@ class Bot(commands.AutoShardedBot):
     async def setup_hook(self):
         """Load extensions and sync commands"""
         self.session = aiohttp.ClientSession()
+        self.cases.start()
+        if self.ipc:
+            self.ipc.start()
+        self.chunker.start()
 
         for feature in config.Settings.features:
             try:
@@ -162,12 +255,21 @@ class Bot(commands.AutoShardedBot):
             except Exception as e:
                 logger.exception(e)
 
+        # started after the features so their job handlers are registered
+        await self.scheduler.start()
+
         # try:
         #     synced = await self.tree.sync()
         #     logger.info(f"Synced {len(synced)} slash command(s) globally")
         # except Exception as e:
         #     logger.exception(e)
 
+    async def close(self) -> None:
+        await self.scheduler.close()
+        await self.cases.close()
+        await self.chunker.close()
+        await super().close()
+
     async def on_message(self, message):
         if str(self.user.id) in message.content:
             await message.channel.send(
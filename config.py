@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 class Settings:
     owner_id: int = 123456789012345678
@@ -7,10 +7,21 @@ class Settings:
     production: bool = False
     default_prefix = ";"
     db_path = "data/sqlite/main.db"
-    
+    antinuke_tracker: str = "exact"  # "exact" or "bucketed" (fixed memory per key)
+    chunk_concurrency: int = 2  # guilds chunked at once
+    chunk_idle: int = 3600  # seconds before an unused member cache is dropped, 0 keeps it
+    member_cache: Optional[List[str]] = None  # "joined" and/or "voice", None derives it from the intents
+    message_cache: Optional[int] = None  # cached messages, None disables the cache
+    presences: bool = False  # online counts and activities, needs the privileged presence intent
+    debug_events: bool = False  # dispatch raw socket events
+    clusters: int = 1  # processes, each running a contiguous range of shards
+    shard_count: Optional[int] = None  # None uses Discord's recommended count
+
+    # intents are the union of what each of these declares in INTENTS
     features: List[str] = [
         "moderation.events",
         "moderation.punishment",
+        "moderation.cases",
         "miscellaneous.information",
         "miscellaneous.prefix",
         "miscellaneous.help",
@@ -11,6 +11,9 @@ import discord
 from .api import client
 
 
+INTENTS = discord.Intents.none()
+
+
 class Crypto(commands.Cog):
     """
     CryptoCompare API interactions
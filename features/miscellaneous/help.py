@@ -8,6 +8,9 @@ from bot import Bot
 from helpers.context import Context
 
 
+INTENTS = discord.Intents.none()
+
+
 class Help(commands.Cog):
     """
     Help commands
@@ -1,13 +1,21 @@
 from typing import Optional, Union
-from discord.ext import commands
+from discord.ext import commands, tasks
 
+import asyncio
 import discord
 import config
 
 from bot import Bot
+from helpers.chunking import requires_members
+from helpers.cluster import bot_stats
 from helpers.context import Context
 
 
+INTENTS = discord.Intents(
+    members=True, presences=config.Settings.presences, voice_states=True
+)
+
+
 class Information(commands.Cog):
     """
     Information related commands
@@ -15,6 +23,44 @@ class Information(commands.Cog):
 
     def __init__(self, bot: Bot):
         self.bot = bot
+        self.reconcile_loop.start()
+
+    def cog_unload(self):
+        self.reconcile_loop.cancel()
+
+    @tasks.loop(minutes=30)
+    async def reconcile_loop(self):
+        for guild_id in list(self.bot.counters.counts):
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                self.bot.counters.discard(guild_id)
+            else:
+                self.bot.counters.reconcile(guild)
+            await asyncio.sleep(0)
+
+    @reconcile_loop.before_loop
+    async def before_reconcile_loop(self):
+        await self.bot.wait_until_ready()
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self.bot.counters.member_join(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        self.bot.counters.member_remove(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        self.bot.counters.member_update(before, after)
+
+    @commands.Cog.listener()
+    async def on_presence_update(self, before: discord.Member, after: discord.Member):
+        self.bot.counters.presence_update(before, after)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.bot.counters.discard(guild.id)
 
     @commands.group(name="invite", aliases=["inv"], invoke_without_command=True)
     @commands.cooldown(1, 4, commands.BucketType.user)
@@ -269,15 +315,72 @@ class Information(commands.Cog):
                 allowed_mentions=discord.AllowedMentions(users=False),
             )
 
+    @commands.command(name="botinfo", aliases=["bi", "about"])
+    @commands.cooldown(1, 4, commands.BucketType.user)
+    async def botinfo(self, context: Context) -> discord.Message:
+        """
+        Display the bot's information
+        """
+        clusters = []
+        if self.bot.ipc:
+            clusters = await self.bot.ipc.gather("stats")
+        if not clusters:
+            clusters = [await bot_stats(self.bot)]
+
+        shards = sum(len(cluster["shards"]) for cluster in clusters)
+        latency = sum(cluster["latency"] for cluster in clusters) / len(clusters)
+
+        embed = discord.Embed(color=config.Color.default)
+        embed.set_author(
+            name=self.bot.user.name, icon_url=self.bot.user.display_avatar.url
+        )
+        embed.add_field(
+            name="Servers",
+            value=f"{sum(cluster['guilds'] for cluster in clusters):,}",
+            inline=False,
+        )
+        embed.add_field(
+            name="Users",
+            value=f"{sum(cluster['users'] for cluster in clusters):,}",
+            inline=False,
+        )
+        embed.add_field(
+            name="Shards",
+            value=f"{shards} across {len(clusters)} cluster{'s' if len(clusters) != 1 else ''}",
+            inline=False,
+        )
+        embed.add_field(name="Latency", value=f"{latency * 1000:.0f}ms", inline=False)
+
+        jobs = [cluster["jobs"] for cluster in clusters if cluster.get("jobs")]
+        if jobs:
+            embed.add_field(
+                name="Scheduled Jobs",
+                value=(
+                    f"{sum(job['scheduled'] for job in jobs):,} scheduled, "
+                    f"{sum(job['backlog'] for job in jobs):,} running\n"
+                    f"{sum(job['done'] for job in jobs):,} done at "
+                    f"{sum(job['rate'] for job in jobs):.1f}/s, "
+                    f"{sum(job['failed'] for job in jobs):,} failed"
+                ),
+                inline=False,
+            )
+
+        embed.set_footer(
+            text=f"Requested by {context.author}",
+            icon_url=context.author.display_avatar.url,
+        )
+
+        return await context.send(embed=embed)
+
     @commands.command(name="serverinfo", aliases=["si", "guildinfo", "gi"])
     @commands.cooldown(1, 4, commands.BucketType.user)
+    @requires_members()
     async def serverinfo(self, context: Context) -> discord.Message:
         """
         Display the server's information
         """
         guild = context.guild
-        bots = sum(1 for m in guild.members if m.bot)
-        humans = guild.member_count - bots
+        counts = self.bot.counters.get(guild)
 
         embed = discord.Embed(color=config.Color.default)
         embed.set_author(
@@ -301,14 +404,20 @@ class Information(commands.Cog):
 
         embed.add_field(
             name="Members",
-            value=f"{guild.member_count:,} total\n{humans:,} humans\n{bots:,} bots",
+            value=(
+                f"{guild.member_count:,} total\n{counts.humans:,} humans\n"
+                f"{counts.bots:,} bots"
+                + (f"\n{counts.online:,} online" if config.Settings.presences else "")
+            )
+            if counts
+            else f"{guild.member_count:,} total",
             inline=False,
         )
         boost_info = (
             f"Level {guild.premium_tier}\n{guild.premium_subscription_count} boosts"
         )
-        if guild.premium_subscriber_role:
-            boost_info += f"\n{len(guild.premium_subscribers)} boosters"
+        if counts and guild.premium_subscriber_role:
+            boost_info += f"\n{counts.boosters} boosters"
 
         embed.add_field(name="Boosts", value=boost_info, inline=False)
 
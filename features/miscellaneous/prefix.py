@@ -7,6 +7,9 @@ from bot import Bot
 from helpers.context import Context
 
 
+INTENTS = discord.Intents.none()
+
+
 class Prefix(commands.Cog):
     """
     Prefix management commands
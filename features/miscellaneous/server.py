@@ -1,12 +1,23 @@
-from typing import Optional
+from typing import Iterator, List, Literal, Optional, Tuple, Union
 from discord.ext import commands
+from time import monotonic
 
+import asyncio
+import logging
 import discord
+import config
 
 from bot import Bot
 from helpers.context import Context
+from helpers.overwrites import apply_overwrites, plan_overwrites
 from helpers.converters import Member
 from helpers.converters.role import Role
+from helpers.converters.selector import Selector
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+INTENTS = discord.Intents(members=True)
 
 
 class RoleFlags(commands.FlagConverter, prefix="--", delimiter=" "):
@@ -18,6 +29,40 @@ class RoleFlags(commands.FlagConverter, prefix="--", delimiter=" "):
     permissions: Optional[int] = commands.flag(default=0, description="Role permissions value")
 
 
+RESTRICTIONS = {
+    "pic": ("picture", ("attach_files", "embed_links"), "no pics"),
+    "stream": ("screenshare", ("stream",), "no stream"),
+}
+
+ROLE_CHUNK = 100
+
+
+def pending_members(
+    guild: discord.Guild,
+    selector: Selector,
+    role: discord.Role,
+    add: bool,
+) -> Iterator[List[discord.Member]]:
+    """
+    Yield cached members the bulk role edit still has to touch,
+    ``ROLE_CHUNK`` at a time. Members that already have (or lack) the role
+    are skipped, which is what makes an interrupted run safe to resume.
+    """
+    chunk: List[discord.Member] = []
+    # one snapshot of the cache, which changes while chunks are awaited
+    for member in tuple(guild._members.values()):
+        if not selector.matches(member) or (member.get_role(role.id) is not None) == add:
+            continue
+
+        chunk.append(member)
+        if len(chunk) == ROLE_CHUNK:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
 class Server(commands.Cog):
     """
     Server management commands
@@ -25,11 +70,208 @@ class Server(commands.Cog):
 
     def __init__(self, bot: Bot) -> None:
         self.bot = bot
+        self.db = bot.db
+        self.restrictions: dict[tuple[int, str], int] = {}
+        self.role_tasks: dict[int, asyncio.Task] = {}
+        self.resume_task: Optional[asyncio.Task] = None
+
+    async def cog_load(self) -> None:
+        rows = await self.db.fetchall(
+            """
+            SELECT guild_id, kind, role_id
+            FROM restriction_roles
+            """
+        )
+        self.restrictions = {(row[0], row[1]): row[2] for row in rows}
+        self.resume_task = asyncio.create_task(self.resume_role_tasks())
+
+    async def cog_unload(self) -> None:
+        # rows are kept so the runs resume on the next load
+        if self.resume_task:
+            self.resume_task.cancel()
+        for task in self.role_tasks.values():
+            task.cancel()
+
+    async def resume_role_tasks(self) -> None:
+        await self.bot.wait_until_ready()
+
+        rows = await self.db.fetchall(
+            """
+            SELECT guild_id, role_id, action, selector, channel_id, moderator_id, done, failed
+            FROM role_tasks
+            """
+        )
+        # failures are not carried over, those members are simply retried
+        for guild_id, role_id, action, selector, channel_id, moderator_id, done, _ in rows:
+            # other clusters resume their own guilds, unavailable ones on the next start
+            guild = self.bot.get_guild(guild_id)
+            if not self.bot.owns_guild(guild_id) or guild is None or guild.unavailable:
+                continue
+
+            role = guild.get_role(role_id)
+            channel = guild.get_channel(channel_id)
+            if not role or not channel:
+                await self.db.execute(
+                    """
+                    DELETE FROM role_tasks
+                    WHERE guild_id = ?
+                    """,
+                    (guild_id,),
+                )
+                continue
+
+            self.role_tasks[guild_id] = asyncio.create_task(
+                self.bulk_role(
+                    guild,
+                    role,
+                    action == "add",
+                    Selector.parse(selector),
+                    channel,
+                    moderator_id,
+                    done,
+                )
+            )
+
+    async def bulk_role(
+        self,
+        guild: discord.Guild,
+        role: discord.Role,
+        add: bool,
+        selector: Selector,
+        channel: discord.abc.Messageable,
+        moderator_id: int,
+        done: int = 0,
+        failed: int = 0,
+    ) -> None:
+        """
+        Add or remove a role across a member selection in chunks, saving
+        progress after every chunk
+        """
+        try:
+            verb = "adding" if add else "removing"
+            reason = f"bulk role {'add' if add else 'remove'} by {guild.get_member(moderator_id) or moderator_id}"
+            semaphore = asyncio.Semaphore(5)
+
+            message = await channel.send(
+                f"{verb} {role.mention} for {selector.describe()}"
+                + ("" if guild.chunked else " (cached members only)")
+                + "...",
+                allowed_mentions=discord.AllowedMentions.none(),
+            )
 
+            async def edit(member: discord.Member) -> bool:
+                async with semaphore:
+                    try:
+                        if add:
+                            await member.add_roles(role, reason=reason)
+                        else:
+                            await member.remove_roles(role, reason=reason)
+                        return True
+
+                    except discord.HTTPException:
+                        return False
+
+            started = last = monotonic()
+            processed = 0
+            for chunk in pending_members(guild, selector, role, add):
+                results = await asyncio.gather(*(edit(member) for member in chunk))
+                succeeded = sum(results)
+                done += succeeded
+                failed += len(chunk) - succeeded
+                processed += len(chunk)
+
+                await self.db.execute(
+                    """
+                    UPDATE role_tasks
+                    SET done = ?, failed = ?
+                    WHERE guild_id = ?
+                    """,
+                    (done, failed, guild.id),
+                )
 
-    @commands.command(
+                if monotonic() - last >= 5:
+                    last = monotonic()
+                    try:
+                        await message.edit(
+                            content=f"{verb} {role.mention}, **{done + failed}** done "
+                            f"({processed / (last - started):.1f}/s), **{failed}** failed..."
+                        )
+                    except discord.HTTPException:
+                        pass
+
+            elapsed = monotonic() - started
+            await self.db.execute(
+                """
+                DELETE FROM role_tasks
+                WHERE guild_id = ?
+                """,
+                (guild.id,),
+            )
+
+            await message.edit(
+                content=f"{config.Emoji.Context.success} {'added' if add else 'removed'} {role.mention} "
+                f"{'to' if add else 'from'} **{done}** {selector.describe()} in {elapsed:.0f}s "
+                f"({processed / elapsed if elapsed else 0:.1f}/s)"
+                + (f", **{failed}** failed" if failed else "")
+            )
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception:
+            logger.exception(f"Bulk role edit failed in {guild.id}")
+
+        finally:
+            self.role_tasks.pop(guild.id, None)
+
+    async def start_bulk_role(
+        self,
+        context: Context,
+        selector: Selector,
+        role: discord.Role,
+        add: bool,
+    ) -> Optional[discord.Message]:
+        if context.guild.id in self.role_tasks:
+            return await context.error(
+                f"a bulk role edit is already running, use `{context.prefix}role cancel` to stop it"
+            )
+
+        await self.db.execute(
+            """
+            INSERT INTO role_tasks (guild_id, role_id, action, selector, channel_id, moderator_id)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (guild_id) DO UPDATE SET
+                role_id = excluded.role_id,
+                action = excluded.action,
+                selector = excluded.selector,
+                channel_id = excluded.channel_id,
+                moderator_id = excluded.moderator_id,
+                done = 0,
+                failed = 0
+            """,
+            (
+                context.guild.id,
+                role.id,
+                "add" if add else "remove",
+                str(selector),
+                context.channel.id,
+                context.author.id,
+            ),
+        )
+
+        self.role_tasks[context.guild.id] = asyncio.create_task(
+            self.bulk_role(context.guild, role, add, selector, context.channel, context.author.id)
+        )
+
+    @staticmethod
+    def restricted_channels(guild: discord.Guild, kind: str) -> List[discord.abc.GuildChannel]:
+        return guild.text_channels if kind == "pic" else guild.voice_channels
+
+
+    @commands.group(
         name="pic", 
-        aliases=["picperms"]
+        aliases=["picperms"],
+        invoke_without_command=True
     )
     @commands.cooldown(1, 4, commands.BucketType.guild)
     @commands.has_permissions(manage_roles=True)
@@ -41,44 +283,38 @@ class Server(commands.Cog):
         """
         Give or remove pic perms from a user
         """
-        member = member or context.author
-
-        first_channel = (
-            context.guild.text_channels[0] if context.guild.text_channels else None
+        if (context.guild.id, "pic") in self.restrictions:
+            return await self.toggle_role(context, member or context.author, "pic")
+
+        return await self.toggle_overwrites(
+            context,
+            member or context.author,
+            context.guild.text_channels,
+            ("attach_files", "embed_links"),
+            "picture",
         )
 
-        perms = first_channel.overwrites_for(member)
-        currently_denied = perms.attach_files is False
-
-        for channel in context.guild.text_channels:
-            if currently_denied:
-                await channel.set_permissions(
-                    member,
-                    attach_files=None,
-                    embed_links=None,
-                    reason=f"granted picture permissions by {context.author}",
-                )
-            else:
-                await channel.set_permissions(
-                    member,
-                    attach_files=False,
-                    embed_links=False,
-                    reason=f"removed picture permissions by {context.author}",
-                )
 
-        if currently_denied:
-            return await context.confirm(
-                f"granted picture permissions to {member.mention} globally"
-            )
-        else:
-            return await context.confirm(
-                f"removed picture permissions from {member.mention} globally"
-            )
+    @pic.command(
+        name="mode"
+    )
+    @commands.cooldown(1, 30, commands.BucketType.guild)
+    @commands.has_permissions(manage_roles=True, manage_channels=True)
+    async def pic_mode(
+        self,
+        context: Context,
+        mode: Literal["role", "channel"],
+    ) -> discord.Message:
+        """
+        Toggle pic perms with a role or per-channel overwrites
+        """
+        return await self.set_mode(context, "pic", mode)
 
 
-    @commands.command(
+    @commands.group(
         name="screenshare",
-        aliases=["ss"]
+        aliases=["ss"],
+        invoke_without_command=True
     )
     @commands.cooldown(1, 4, commands.BucketType.guild)
     @commands.has_permissions(manage_roles=True)
@@ -90,37 +326,208 @@ class Server(commands.Cog):
         """
         Give or remove screenshare perms from a user
         """
-        member = member or context.author
+        if (context.guild.id, "stream") in self.restrictions:
+            return await self.toggle_role(context, member or context.author, "stream")
+
+        return await self.toggle_overwrites(
+            context,
+            member or context.author,
+            context.guild.voice_channels,
+            ("stream",),
+            "screenshare",
+        )
+
+    @screenshare.command(
+        name="mode"
+    )
+    @commands.cooldown(1, 30, commands.BucketType.guild)
+    @commands.has_permissions(manage_roles=True, manage_channels=True)
+    async def screenshare_mode(
+        self,
+        context: Context,
+        mode: Literal["role", "channel"],
+    ) -> discord.Message:
+        """
+        Toggle screenshare perms with a role or per-channel overwrites
+        """
+        return await self.set_mode(context, "stream", mode)
+
+    async def set_mode(self, context: Context, kind: str, mode: str) -> discord.Message:
+        """
+        Switch a guild between role and per-channel restrictions, creating
+        the restriction role and its denies once
+        """
+        label, permissions, name = RESTRICTIONS[kind]
+        role_id = self.restrictions.get((context.guild.id, kind))
+        role = context.guild.get_role(role_id) if role_id else None
+
+        if mode == "channel":
+            if not role_id:
+                return await context.error(f"{label} permissions already use channel overwrites")
+
+            await self.db.execute(
+                """
+                DELETE FROM restriction_roles
+                WHERE guild_id = ? AND kind = ?
+                """,
+                (context.guild.id, kind),
+            )
+            del self.restrictions[(context.guild.id, kind)]
+            if role:
+                # deleting the role drops every overwrite that references it
+                await role.delete(reason=f"{label} permissions switched to channels by {context.author}")
+
+            return await context.confirm(f"{label} permissions now use channel overwrites")
+
+        if role is None:
+            role = await context.guild.create_role(
+                name=name,
+                permissions=discord.Permissions.none(),
+                reason=f"{label} permissions switched to a role by {context.author}",
+            )
 
-        first_channel = (
-            context.guild.voice_channels[0] if context.guild.voice_channels else None
+        channels = self.restricted_channels(context.guild, kind)
+        categories = list(
+            {channel.category.id: channel.category for channel in channels if channel.category}.values()
+        )
+        changes = plan_overwrites(
+            categories + channels,
+            role,
+            **{permission: False for permission in permissions},
+        )
+        _, failed = await apply_overwrites(
+            changes,
+            role,
+            reason=f"{label} restriction role set up by {context.author}",
         )
 
-        perms = first_channel.overwrites_for(member)
-        currently_denied = perms.stream is False
+        await self.db.execute(
+            """
+            INSERT INTO restriction_roles (guild_id, kind, role_id)
+            VALUES (?, ?, ?)
+            ON CONFLICT (guild_id, kind) DO UPDATE SET
+                role_id = excluded.role_id
+            """,
+            (context.guild.id, kind, role.id),
+        )
+        self.restrictions[(context.guild.id, kind)] = role.id
 
-        for channel in context.guild.voice_channels:
-            if currently_denied:
-                await channel.set_permissions(
-                    member,
-                    stream=None,
-                    reason=f"granted screenshare permissions by {context.author}",
-                )
-            else:
+        return await context.confirm(
+            f"{label} permissions are now toggled with {role.mention}"
+            + (f", failed to set up **{len(failed)}** channels" if failed else "")
+        )
+
+    async def toggle_role(self, context: Context, member: discord.Member, kind: str) -> discord.Message:
+        """
+        Restrict or unrestrict a member with a single role edit
+        """
+        label = RESTRICTIONS[kind][0]
+        role = context.guild.get_role(self.restrictions[(context.guild.id, kind)])
+        if role is None:
+            return await context.error(
+                f"the {label} restriction role was deleted, "
+                f"run `{context.prefix}{context.command.qualified_name} mode role` again"
+            )
+
+        if role in member.roles:
+            await member.remove_roles(role, reason=f"granted {label} permissions by {context.author}")
+            return await context.confirm(f"granted {label} permissions to {member.mention} globally")
+
+        await member.add_roles(role, reason=f"removed {label} permissions by {context.author}")
+        return await context.confirm(f"removed {label} permissions from {member.mention} globally")
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel) -> None:
+        """
+        Deny the restriction role in new channels that do not inherit it
+        """
+        for kind, (label, permissions, _) in RESTRICTIONS.items():
+            role_id = self.restrictions.get((channel.guild.id, kind))
+            expected = discord.TextChannel if kind == "pic" else discord.VoiceChannel
+            if not role_id or not isinstance(channel, expected):
+                continue
+
+            role = channel.guild.get_role(role_id)
+            if role is None or not channel.overwrites_for(role).is_empty():
+                continue
+
+            try:
                 await channel.set_permissions(
-                    member,
-                    stream=False,
-                    reason=f"removed screenshare permissions by {context.author}",
+                    role,
+                    **{permission: False for permission in permissions},
+                    reason=f"{label} restriction role",
                 )
+            except discord.HTTPException:
+                pass
 
-        if currently_denied:
-            return await context.confirm(
-                f"granted screenshare permissions to {member.mention} globally"
+    async def toggle_overwrites(
+        self,
+        context: Context,
+        member: discord.Member,
+        channels: List[discord.abc.GuildChannel],
+        permissions: Tuple[str, ...],
+        label: str,
+    ) -> discord.Message:
+        """
+        Flip *permissions* for a member across *channels*, only editing
+        channels whose overwrite actually changes
+        """
+        if not channels:
+            return await context.error(f"this server has no channels for {label} permissions")
+
+        denied = getattr(channels[0].overwrites_for(member), permissions[0]) is False
+        verb = "granted" if denied else "removed"
+        changes = plan_overwrites(
+            channels,
+            member,
+            **{permission: None if denied else False for permission in permissions},
+        )
+
+        message = None
+        if len(changes) > 10:
+            message = await context.send(
+                f"updating {label} permissions in **{len(changes)}** channels..."
             )
-        else:
-            return await context.confirm(
-                f"removed screenshare permissions from {member.mention} globally"
+
+        last = monotonic()
+
+        async def progress(done: int, failed: int) -> None:
+            nonlocal last
+            if message is None or monotonic() - last < 2:
+                return
+
+            last = monotonic()
+            try:
+                await message.edit(
+                    content=f"updating {label} permissions, "
+                    f"**{done}**/{len(changes)} channels done, **{failed}** failed..."
+                )
+            except discord.HTTPException:
+                pass
+
+        done, failed = await apply_overwrites(
+            changes,
+            member,
+            reason=f"{verb} {label} permissions by {context.author}",
+            progress=progress,
+        )
+
+        content = (
+            f"{config.Emoji.Context.success} {verb} {label} permissions "
+            f"{'to' if denied else 'from'} {member.mention} globally"
+            + (
+                f", failed in **{len(failed)}** channels: "
+                + ", ".join(channel.mention for channel in failed[:5])
+                + ("..." if len(failed) > 5 else "")
+                if failed
+                else ""
             )
+        )
+
+        if message:
+            return await message.edit(content=content)
+
+        return await context.send(content)
 
 
     @commands.group(
@@ -188,13 +595,16 @@ class Server(commands.Cog):
     async def role_add(
         self,
         context: Context,
-        member: Member,
+        member: Union[Selector, Member],
         *, 
         role: Role
     ) -> discord.Message:
         """
-        Assign a role to a member
+        Assign a role to a member, or to all, humans, bots or has:<role>
         """
+        if isinstance(member, Selector):
+            return await self.start_bulk_role(context, member, role, add=True)
+
         await member.add_roles(
             role,
             reason=f"role assigned by {context.author}"
@@ -214,13 +624,16 @@ class Server(commands.Cog):
     async def role_remove(
         self,
         context: Context,
-        member: Member,
+        member: Union[Selector, Member],
         *, 
         role: Role
     ) -> discord.Message:
         """
-        Remove a role from a member
+        Remove a role from a member, or from all, humans, bots or has:<role>
         """
+        if isinstance(member, Selector):
+            return await self.start_bulk_role(context, member, role, add=False)
+
         await member.remove_roles(
             role,
             reason=f"role removed by {context.author}"
@@ -231,6 +644,35 @@ class Server(commands.Cog):
         )
 
 
+    @role.command(
+        name="cancel",
+        aliases=["stop"]
+    )
+    @commands.has_permissions(manage_roles=True)
+    @commands.cooldown(1, 4, commands.BucketType.guild)
+    async def role_cancel(
+        self,
+        context: Context,
+    ) -> discord.Message:
+        """
+        Stop a running bulk role edit
+        """
+        task = self.role_tasks.pop(context.guild.id, None)
+        if not task:
+            return await context.error("there is no bulk role edit running")
+
+        task.cancel()
+        await self.db.execute(
+            """
+            DELETE FROM role_tasks
+            WHERE guild_id = ?
+            """,
+            (context.guild.id,),
+        )
+
+        return await context.confirm("stopped the bulk role edit")
+
+
     @role.command(
         name="delete",
         aliases=["del"]
@@ -0,0 +1,125 @@
+from typing import Union
+
+from discord.ext import commands
+
+import discord
+
+from bot import Bot
+from helpers.cases import PAGE_SIZE
+from helpers.context import Context
+
+
+INTENTS = discord.Intents.none()
+
+
+def format_case(row) -> str:
+    case_id, moderator_id, action, reason, created_at, expires_at = row
+    return (
+        f"`#{case_id}` **{action}** by <@{moderator_id}> <t:{created_at}:R>"
+        + (f" until <t:{expires_at}:f>" if expires_at else "")
+        + (f": {reason}" if reason and reason != "N/A" else "")
+    )
+
+
+class Cases(commands.Cog):
+    """
+    Moderation case history
+    """
+
+    def __init__(self, bot: Bot):
+        self.bot = bot
+        self.cases = bot.cases
+
+    @commands.command(
+        name="history",
+        aliases=["cases", "modlogs"],
+    )
+    @commands.has_guild_permissions(moderate_members=True)
+    @commands.cooldown(1, 4, commands.BucketType.user)
+    async def history(
+        self,
+        context: Context,
+        *,
+        user: Union[discord.Member, discord.User],
+    ) -> discord.Message:
+        """
+        View the moderation history of a user
+        """
+        rows = await self.cases.history(context.guild.id, user.id, limit=PAGE_SIZE + 1)
+        if not rows:
+            return await context.error(f"no cases found for {user.mention}")
+
+        page = {"rows": rows[:PAGE_SIZE], "older": len(rows) > PAGE_SIZE, "newer": False}
+
+        def render() -> str:
+            return f"cases for {user.mention}\n" + "\n".join(
+                format_case(row) for row in page["rows"]
+            )
+
+        if not page["older"]:
+            return await context.send(
+                render(), allowed_mentions=discord.AllowedMentions.none()
+            )
+
+        view = discord.ui.View(timeout=120)
+        newer = discord.ui.Button(label="newer", style=discord.ButtonStyle.secondary, disabled=True)
+        older = discord.ui.Button(label="older", style=discord.ButtonStyle.secondary)
+
+        async def turn(interaction: discord.Interaction, forward: bool) -> None:
+            if interaction.user.id != context.author.id:
+                return await interaction.response.send_message(
+                    "this isn't for you", ephemeral=True
+                )
+
+            # keyset pagination, the next page starts after the edge case ID
+            if forward:
+                rows = await self.cases.history(
+                    context.guild.id, user.id, before=page["rows"][-1][0], limit=PAGE_SIZE + 1
+                )
+                page.update(rows=rows[:PAGE_SIZE], older=len(rows) > PAGE_SIZE, newer=True)
+            else:
+                rows = await self.cases.history(
+                    context.guild.id, user.id, after=page["rows"][0][0], limit=PAGE_SIZE + 1
+                )
+                page.update(rows=rows[-PAGE_SIZE:], older=True, newer=len(rows) > PAGE_SIZE)
+
+            older.disabled = not page["older"]
+            newer.disabled = not page["newer"]
+            await interaction.response.edit_message(content=render(), view=view)
+
+        async def older_callback(interaction: discord.Interaction):
+            await turn(interaction, True)
+
+        async def newer_callback(interaction: discord.Interaction):
+            await turn(interaction, False)
+
+        older.callback = older_callback
+        newer.callback = newer_callback
+        view.add_item(newer)
+        view.add_item(older)
+
+        return await context.send(
+            render(), view=view, allowed_mentions=discord.AllowedMentions.none()
+        )
+
+    @commands.command(
+        name="case",
+    )
+    @commands.has_guild_permissions(moderate_members=True)
+    @commands.cooldown(1, 4, commands.BucketType.user)
+    async def case(self, context: Context, case_id: int) -> discord.Message:
+        """
+        View a single moderation case
+        """
+        row = await self.cases.get(context.guild.id, case_id)
+        if not row:
+            return await context.error(f"case `#{case_id}` was not found")
+
+        return await context.send(
+            f"<@{row[1]}> ({row[1]}): " + format_case((row[0], *tuple(row)[2:])),
+            allowed_mentions=discord.AllowedMentions.none(),
+        )
+
+
+async def setup(bot: Bot) -> None:
+    await bot.add_cog(Cases(bot))
\ No newline at end of file
@@ -1,14 +1,21 @@
-from typing import Optional
+from typing import Any, Dict
 
+from datetime import datetime, timedelta
 from discord.ext import commands
-from discord.ext import tasks
+
+import logging
 
 import discord
-import aiosqlite
 
 from bot import Bot
 
 
+logger: logging.Logger = logging.getLogger(__name__)
+
+INTENTS = discord.Intents(moderation=True)
+MISSING_GUILD_RETRY = timedelta(minutes=5)
+
+
 class Events(commands.Cog):
     """
     Event listeners
@@ -17,78 +24,116 @@ class Events(commands.Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
         self.db = bot.db
-        self.unban_check.start()
+        self.scheduler = bot.scheduler
+        self.tempbans: set[tuple[int, int]] = set()
+
+    async def cog_load(self) -> None:
+        self.scheduler.register("unban", self.unban)
+        await self.migrate_unbans()
+
+        records = await self.db.fetchall(
+            """
+            SELECT guild_id, json_extract(payload, '$.user_id')
+            FROM jobs
+            WHERE kind = 'unban'
+            """
+        )
+        self.tempbans = {(record[0], record[1]) for record in records}
+
+    async def cog_unload(self) -> None:
+        self.scheduler.unregister("unban")
 
-    @tasks.loop(minutes=1)
-    async def unban_check(self) -> Optional[aiosqlite.Cursor]:
+    async def migrate_unbans(self) -> None:
         """
-        Loop to check for unbans
+        Move tempbans left in the legacy unbans table onto the scheduler
         """
-        current_time = discord.utils.utcnow().isoformat()
         records = await self.db.fetchall(
             """
-            SELECT guild_id, user_id
+            SELECT guild_id, user_id, unban_time
             FROM unbans
-            WHERE unban_time <= ?
-            """,
-            (
-                current_time,
-            ),
+            """
         )
+        if not records:
+            return
 
         for record in records:
-            guild = self.bot.get_guild(record[0])
-            if guild is None:
-                continue
-
-            user = discord.Object(id=record[1])
-            try:
-                await guild.unban(user, reason="Temporary ban expired")
-
-            except discord.NotFound:
-                pass
-
-            await self.db.execute(
-                """
-                DELETE FROM unbans
-                WHERE guild_id = ? 
-                AND user_id = ?
-                """,
-                (
-                    record[0],
-                    record[1],
-                ),
+            await self.scheduler.schedule(
+                "unban",
+                datetime.fromisoformat(record[2]),
+                key=f"unban:{record[0]}:{record[1]}",
+                guild_id=record[0],
+                user_id=record[1],
+            )
+
+        await self.db.execute("DELETE FROM unbans")
+        logger.info(f"Moved {len(records)} tempbans to the scheduler")
+
+    async def schedule_tempban(self, guild_id: int, user_id: int, when: datetime) -> None:
+        await self.scheduler.schedule(
+            "unban",
+            when,
+            key=f"unban:{guild_id}:{user_id}",
+            guild_id=guild_id,
+            user_id=user_id,
+        )
+        self.tempbans.add((guild_id, user_id))
+
+    async def lift_tempban(self, guild_id: int, user_id: int) -> bool:
+        """
+        Cancel a pending tempban, only touching the database if one exists
+        """
+        if (guild_id, user_id) not in self.tempbans:
+            return False
+
+        self.tempbans.discard((guild_id, user_id))
+        await self.scheduler.cancel(f"unban:{guild_id}:{user_id}")
+        return True
+
+    async def unban(self, payload: Dict[str, Any]) -> None:
+        """
+        Lift an expired tempban, raising lets the scheduler retry it
+        """
+        pair = (payload["guild_id"], payload["user_id"])
+        guild = self.bot.get_guild(pair[0])
+        if guild is None:
+            # unavailable or not received yet, on_guild_remove drops it if we left
+            await self.schedule_tempban(*pair, discord.utils.utcnow() + MISSING_GUILD_RETRY)
+            return
+
+        # dropped first so our own unban event skips the database
+        self.tempbans.discard(pair)
+
+        try:
+            await guild.unban(
+                discord.Object(id=payload["user_id"]), reason="Temporary ban expired"
+            )
+
+        except discord.NotFound:
+            pass
+
+        except discord.Forbidden:
+            logger.warning(
+                f"Missing permissions to lift tempban {payload['user_id']} in {guild.id}"
             )
 
+        except discord.HTTPException:
+            self.tempbans.add(pair)
+            raise
+
     @commands.Cog.listener()
     async def on_member_unban(self, guild: discord.Guild, user: discord.User):
         """
         Listener for when a member is unbanned from the server
         """
-        record = await self.db.fetchrow(
-            """
-            SELECT user_id
-            FROM unbans
-            WHERE guild_id = ? AND user_id = ?
-            """,
-            (
-                guild.id,
-                user.id,
-            ),
-        )
+        await self.lift_tempban(guild.id, user.id)
 
-        if record:
-            await self.db.execute(
-                """
-                DELETE FROM unbans
-                WHERE guild_id = ? 
-                AND user_id = ?
-                """,
-                (
-                    guild.id,
-                    user.id,
-                ),
-            )
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        """
+        Listener for when the bot leaves a server, its tempbans can't be lifted anymore
+        """
+        for guild_id, user_id in [pair for pair in self.tempbans if pair[0] == guild.id]:
+            await self.lift_tempban(guild_id, user_id)
 
 
 async def setup(bot: Bot) -> None:
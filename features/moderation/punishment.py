@@ -1,12 +1,32 @@
-from typing import Optional
+from typing import Dict, Optional, Union
 from discord.ext import commands
+from datetime import datetime, timedelta
+from time import monotonic
 
+import re
 import discord
+import config
 
 from bot import Bot
 from helpers.converters.member import Member
 from helpers.converters.duration import Duration
 from helpers.context import Context
+from helpers.enforcement import Enforcer
+
+
+INTENTS = discord.Intents(members=True)
+MASS_LIMIT = 1000
+SNOWFLAKE = re.compile(r"\b\d{15,20}\b")
+
+
+class MassFlags(commands.FlagConverter, prefix="--", delimiter=" "):
+    users: Optional[str] = commands.flag(default=None, positional=True, description="User IDs or mentions")
+    joined: Optional[commands.Range[int, 1, 1440]] = commands.flag(default=None, description="Members who joined in the last N minutes")
+    reason: Optional[str] = commands.flag(default="N/A", description="Reason for the action")
+
+
+class MassTimeoutFlags(MassFlags, prefix="--", delimiter=" "):
+    duration: Optional[Duration] = commands.flag(default=None, description="How long the timeout lasts")
 
 
 class Punishment(commands.Cog):
@@ -17,6 +37,31 @@ class Punishment(commands.Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
         self.db = bot.db
+        self.enforcer = Enforcer("moderation", concurrency=5)
+
+    async def cog_unload(self) -> None:
+        self.enforcer.close()
+
+    async def schedule_tempban(self, guild_id: int, user_id: int, when: datetime) -> None:
+        events = self.bot.get_cog("Events")
+        if events:
+            return await events.schedule_tempban(guild_id, user_id, when)
+
+        # the job waits on the scheduler until Events is loaded to run it
+        await self.bot.scheduler.schedule(
+            "unban",
+            when,
+            key=f"unban:{guild_id}:{user_id}",
+            guild_id=guild_id,
+            user_id=user_id,
+        )
+
+    async def lift_tempban(self, guild_id: int, user_id: int) -> None:
+        events = self.bot.get_cog("Events")
+        if events:
+            await events.lift_tempban(guild_id, user_id)
+        else:
+            await self.bot.scheduler.cancel(f"unban:{guild_id}:{user_id}")
 
     @commands.command(
         name="ban",
@@ -35,6 +80,9 @@ class Punishment(commands.Cog):
         Ban a member from the server
         """
         await context.guild.ban(member, reason=reason)
+        # a permanent ban must not be lifted by an earlier tempban
+        await self.lift_tempban(context.guild.id, member.id)
+        self.bot.cases.record(context.guild.id, member.id, context.author.id, "ban", reason)
         return await context.punishment(punishment="ban", member=member)
 
     @commands.command(
@@ -56,20 +104,16 @@ class Punishment(commands.Cog):
         """
         await context.guild.ban(member, reason=reason)
 
-        await self.db.execute(
-            """
-            INSERT INTO unbans (
-                guild_id, 
-                user_id, 
-                unban_time
-            )
-            VALUES (?, ?, ?)
-            """,
-            (
-                context.guild.id,
-                member.id,
-                duration.to_datetime().isoformat(),
-            ),
+        await self.schedule_tempban(
+            context.guild.id, member.id, duration.to_datetime()
+        )
+        self.bot.cases.record(
+            context.guild.id,
+            member.id,
+            context.author.id,
+            "tempban",
+            reason,
+            duration.to_datetime().timestamp(),
         )
 
         return await context.punishment(
@@ -92,32 +136,8 @@ class Punishment(commands.Cog):
         Unban a member from the server
         """
         await context.guild.unban(user, reason=reason)
-
-        is_scheduled = await self.db.fetchone(
-            """
-            SELECT id
-            FROM unbans
-            WHERE guild_id = ? 
-            AND user_id = ?
-            """,
-            (
-                context.guild.id,
-                user.id,
-            ),
-        )
-
-        if is_scheduled:
-            await self.db.execute(
-                """
-                DELETE FROM unbans
-                WHERE guild_id = ? 
-                AND user_id = ?
-                """,
-                (
-                    context.guild.id,
-                    user.id,
-                ),
-            )
+        await self.lift_tempban(context.guild.id, user.id)
+        self.bot.cases.record(context.guild.id, user.id, context.author.id, "unban", reason)
 
         return await context.punishment(punishment="unban", member=user)
 
@@ -141,6 +161,13 @@ class Punishment(commands.Cog):
             return await context.send("Please provide a duration for the timeout")
 
         await member.timeout(duration.to_datetime())
+        self.bot.cases.record(
+            context.guild.id,
+            member.id,
+            context.author.id,
+            "timeout",
+            expires_at=duration.to_datetime().timestamp(),
+        )
         return await context.punishment(
             punishment="timeout", member=member, until=duration
         )
@@ -162,6 +189,7 @@ class Punishment(commands.Cog):
         Remove timeout from a member
         """
         await member.timeout(None, reason=reason)
+        self.bot.cases.record(context.guild.id, member.id, context.author.id, "untimeout", reason)
         return await context.punishment(punishment="untimeout", member=member)
 
     @commands.command(
@@ -181,8 +209,173 @@ class Punishment(commands.Cog):
         Kick a member from the server
         """
         await context.guild.kick(member, reason=reason)
+        self.bot.cases.record(context.guild.id, member.id, context.author.id, "kick", reason)
         return await context.punishment(punishment="kick", member=member)
 
 
+    async def select_targets(
+        self,
+        context: Context,
+        flags: MassFlags,
+        members_only: bool,
+    ) -> tuple[list[Union[discord.Member, discord.Object]], int]:
+        """
+        Collect targets from IDs, an attached file of IDs and recent joins,
+        returning them with the number skipped for hierarchy or membership
+        """
+        guild = context.guild
+        await self.bot.chunker.request(guild)
+
+        ids = set(map(int, SNOWFLAKE.findall(flags.users or "")))
+        for attachment in context.message.attachments[:1]:
+            if attachment.size > 1_000_000:
+                raise commands.BadArgument("attachment must be under 1MB")
+
+            data = await attachment.read()
+            ids.update(map(int, SNOWFLAKE.findall(data.decode(errors="ignore"))))
+
+        if flags.joined:
+            since = discord.utils.utcnow() - timedelta(minutes=flags.joined)
+            ids.update(
+                member.id
+                for member in guild.members
+                if member.joined_at and member.joined_at >= since
+            )
+
+        ids.difference_update((context.author.id, guild.me.id, guild.owner_id))
+
+        bypass = context.author.id in (guild.owner_id, config.Settings.owner_id)
+        targets: Dict[int, Union[discord.Member, discord.Object]] = {}
+        skipped = 0
+        for user_id in ids:
+            member = guild.get_member(user_id)
+            if member is None:
+                if members_only:
+                    skipped += 1
+                else:
+                    targets[user_id] = discord.Object(id=user_id)
+                continue
+
+            if (
+                (not bypass and context.author.top_role <= member.top_role)
+                or guild.me.top_role <= member.top_role
+            ):
+                skipped += 1
+                continue
+
+            targets[user_id] = member
+
+        return list(targets.values()), skipped
+
+    async def mass(
+        self,
+        context: Context,
+        flags: MassFlags,
+        action: str,
+        verb: str,
+        duration: Optional[timedelta] = None,
+    ) -> discord.Message:
+        targets, skipped = await self.select_targets(
+            context, flags, members_only=action != "ban"
+        )
+        if not targets:
+            return await context.error(
+                "no users to target"
+                + (f", skipped **{skipped}** (role hierarchy or not in the server)" if skipped else "")
+            )
+
+        if len(targets) > MASS_LIMIT:
+            return await context.error(f"you can only target up to **{MASS_LIMIT}** users at once")
+
+        message = await context.send(f"applying **{action}** to **{len(targets)}** users...")
+        last = monotonic()
+
+        async def progress(done: int, failed: int) -> None:
+            nonlocal last
+            if monotonic() - last < 2:
+                return
+
+            last = monotonic()
+            try:
+                await message.edit(
+                    content=f"applying **{action}** to **{len(targets)}** users, "
+                    f"**{done}** done, **{failed}** failed..."
+                )
+            except discord.HTTPException:
+                pass
+
+        done, failed = await self.enforcer.run(
+            context.guild,
+            targets,
+            action,
+            reason=f"{context.author} ({context.author.id}): {flags.reason}"[:512],
+            duration=duration,
+            progress=progress,
+        )
+
+        expires_at = (discord.utils.utcnow() + duration).timestamp() if duration else None
+        for target in done:
+            self.bot.cases.record(
+                context.guild.id, target.id, context.author.id, action, flags.reason, expires_at
+            )
+
+        return await message.edit(
+            content=f"{config.Emoji.Context.success} {verb} **{len(done)}** users"
+            + (f", **{failed}** failed" if failed else "")
+            + (f", skipped **{skipped}** (role hierarchy or not in the server)" if skipped else "")
+        )
+
+    @commands.command(
+        name="massban",
+        aliases=["multiban"],
+    )
+    @commands.has_guild_permissions(ban_members=True)
+    @commands.bot_has_guild_permissions(ban_members=True, manage_guild=True)
+    @commands.max_concurrency(1, commands.BucketType.guild)
+    @commands.cooldown(1, 10, commands.BucketType.guild)
+    async def massban(self, context: Context, *, flags: MassFlags) -> discord.Message:
+        """
+        Ban many users by ID, attachment or recent join
+        """
+        return await self.mass(context, flags, "ban", "banned")
+
+    @commands.command(
+        name="masskick",
+        aliases=["multikick"],
+    )
+    @commands.has_guild_permissions(kick_members=True)
+    @commands.bot_has_guild_permissions(kick_members=True)
+    @commands.max_concurrency(1, commands.BucketType.guild)
+    @commands.cooldown(1, 10, commands.BucketType.guild)
+    async def masskick(self, context: Context, *, flags: MassFlags) -> discord.Message:
+        """
+        Kick many members by ID, attachment or recent join
+        """
+        return await self.mass(context, flags, "kick", "kicked")
+
+    @commands.command(
+        name="masstimeout",
+        aliases=["massmute"],
+    )
+    @commands.has_guild_permissions(moderate_members=True)
+    @commands.bot_has_guild_permissions(moderate_members=True)
+    @commands.max_concurrency(1, commands.BucketType.guild)
+    @commands.cooldown(1, 10, commands.BucketType.guild)
+    async def masstimeout(self, context: Context, *, flags: MassTimeoutFlags) -> discord.Message:
+        """
+        Timeout many members by ID, attachment or recent join
+        """
+        if not flags.duration:
+            return await context.error("provide a duration with **--duration**")
+
+        return await self.mass(
+            context,
+            flags,
+            "timeout",
+            "timed out",
+            duration=flags.duration.to_datetime() - discord.utils.utcnow(),
+        )
+
+
 async def setup(bot: Bot) -> None:
     await bot.add_cog(Punishment(bot))
\ No newline at end of file
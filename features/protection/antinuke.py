@@ -1,20 +1,26 @@
-from typing import Optional
+from typing import Iterable, Optional, Union
 
 from collections import defaultdict
 from datetime import timedelta
-from time import monotonic
 
 import discord
+import config
 
 from discord.ext import commands, tasks
 
 from bot import Bot
+from helpers.chunking import BACKGROUND
 from helpers.context import Context
 from helpers.converters import Modules
+from helpers.dispatcher import Dispatcher
 
-from .models import Punishment
+from .models import Punishment, Trusted
+from .policy import Ladder, compile_ladders
+from .tracker import create_tracker
 
 
+INTENTS = discord.Intents(members=True, moderation=True, emojis_and_stickers=True)
+
 ACTIONS = {
     Punishment.KICK: "kicked",
     Punishment.BAN: "banned",
@@ -36,57 +42,63 @@ MODULES = {
 
 
 class Flags(commands.FlagConverter, prefix="--", delimiter=" "):
-    threshold: Optional[str] = commands.flag(default="3")
+    threshold: commands.Range[int, 1, 1000] = commands.flag(default=3)
     do: Optional[Punishment] = commands.flag(
         default=Punishment.KICK, description="Action to take"
     )
 
 
-class InfractionTracker:
+class TrustedIndex:
     """
-    Rolling-window infraction tracker using monotonic time.
+    Per-guild index of trusted user and role IDs.
 
-    Each (guild_id, module) key maps to a list of monotonic timestamps.
-    Entries older than the configured window are pruned on every read.
+    Snowflakes are unique across users and roles, so both share a
+    single frozenset per guild and a lookup is one membership test.
     """
 
-    __slots__ = ("_window", "_store")
+    __slots__ = ("_store",)
 
-    def __init__(self, window: timedelta = timedelta(minutes=10)):
-        self._window: float = window.total_seconds()
-        self._store: dict[tuple[int, str], list[float]] = defaultdict(list)
+    EMPTY: frozenset[int] = frozenset()
 
-    def _prune(self, key: tuple[int, str]) -> list[float]:
-        cutoff = monotonic() - self._window
-        entries = self._store[key]
-        entries[:] = [ts for ts in entries if ts > cutoff]
-        return entries
+    def __init__(self):
+        self._store: dict[int, frozenset[int]] = {}
 
-    def record(self, guild_id: int, module: str) -> int:
+    def load(self, rows: Iterable[tuple[int, int]]) -> None:
         """
-        Record an infraction and return the current count
-        within the rolling window.
+        Rebuild the index from (guild_id, target_id) rows.
         """
-        key = (guild_id, module)
-        entries = self._prune(key)
-        entries.append(monotonic())
-        return len(entries)
+        grouped: dict[int, set[int]] = defaultdict(set)
+        for guild_id, target_id in rows:
+            grouped[guild_id].add(target_id)
 
-    def reset(self, guild_id: int, module: str) -> None:
-        """
-        Clear all infractions for a key after a punishment fires.
-        """
-        self._store.pop((guild_id, module), None)
+        self._store = {
+            guild_id: frozenset(targets) for guild_id, targets in grouped.items()
+        }
 
-    def purge_stale(self) -> int:
-        """
-        Remove all keys whose entries have fully expired.
-        Returns the number of keys removed.
-        """
-        stale = [key for key in list(self._store) if not self._prune(key)]
-        for key in stale:
-            del self._store[key]
-        return len(stale)
+    def get(self, guild_id: int) -> frozenset[int]:
+        return self._store.get(guild_id, self.EMPTY)
+
+    def add(self, guild_id: int, target_id: int) -> None:
+        self._store[guild_id] = self.get(guild_id) | {target_id}
+
+    def remove(self, guild_id: int, target_id: int) -> None:
+        trusted = self.get(guild_id) - {target_id}
+        if trusted:
+            self._store[guild_id] = trusted
+        else:
+            self._store.pop(guild_id, None)
+
+    def is_trusted(
+        self, guild_id: int, actor: Union[discord.Member, discord.User]
+    ) -> bool:
+        trusted = self._store.get(guild_id)
+        if not trusted:
+            return False
+
+        if actor.id in trusted:
+            return True
+
+        return any(role.id in trusted for role in getattr(actor, "roles", ()))
 
     def clear(self) -> None:
         self._store.clear()
@@ -100,12 +112,23 @@ class Antinuke(commands.Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
         self.db = bot.db
-        self.tracker = InfractionTracker(window=timedelta(minutes=10))
+        self.tracker = create_tracker(
+            config.Settings.antinuke_tracker, window=timedelta(minutes=10)
+        )
+        self.trusted = TrustedIndex()
+        self.policies: dict[tuple[int, str], Ladder] = {}
+        self.dispatcher = Dispatcher("antinuke")
         self.purge_loop.start()
+        self.refresh_loop.start()
 
     def cog_unload(self):
         self.purge_loop.cancel()
+        self.refresh_loop.cancel()
+        self.dispatcher.close()
         self.tracker.clear()
+        self.trusted.clear()
+        self.policies.clear()
+        self.bot.chunker.pin("antinuke", ())
 
     @tasks.loop(minutes=5)
     async def purge_loop(self):
@@ -115,6 +138,62 @@ class Antinuke(commands.Cog):
     async def before_purge_loop(self):
         await self.bot.wait_until_ready()
 
+    @tasks.loop(minutes=1)
+    async def refresh_loop(self):
+        """
+        Reload the whitelist and punishment ladders so changes made
+        through the API are picked up
+        """
+        rows = await self.db.fetchall(
+            """
+            SELECT guild_id, target_id
+            FROM antinuke_whitelist
+            """
+        )
+        self.trusted.load((row[0], row[1]) for row in rows)
+        await self.load_policies()
+
+    async def load_policies(self, guild_id: Optional[int] = None) -> None:
+        """
+        Compile punishment ladders for every guild, or only *guild_id*.
+
+        A module's own threshold and punishment form the first step,
+        followed by any escalation steps from antinuke_policies.
+        """
+        rows = await self.db.fetchall(
+            """
+            SELECT guild_id, module, threshold, punishment
+            FROM (
+                SELECT guild_id, module, threshold, punishment, 0 AS stage
+                FROM antinuke
+                WHERE enabled = 1
+
+                UNION ALL
+
+                SELECT p.guild_id, p.module, p.threshold, p.punishment, 1 AS stage
+                FROM antinuke_policies p
+                JOIN antinuke a
+                ON a.guild_id = p.guild_id
+                AND a.module = p.module
+                WHERE a.enabled = 1
+            )
+            WHERE ? IS NULL
+            OR guild_id = ?
+            ORDER BY stage
+            """,
+            (guild_id, guild_id),
+        )
+        ladders = compile_ladders(tuple(row) for row in rows)
+
+        if guild_id is None:
+            self.policies = ladders
+        else:
+            for key in [key for key in self.policies if key[0] == guild_id]:
+                del self.policies[key]
+            self.policies.update(ladders)
+
+        self.bot.chunker.pin("antinuke", {guild for guild, _ in self.policies})
+
     #
     # Commands
     #
@@ -149,6 +228,15 @@ class Antinuke(commands.Cog):
                 """,
                 (context.guild.id, modules.value),
             )
+            await self.db.execute(
+                """
+                DELETE FROM antinuke_policies
+                WHERE guild_id = ?
+                AND module = ?
+                """,
+                (context.guild.id, modules.value),
+            )
+            await self.load_policies(context.guild.id)
             self.tracker.reset(context.guild.id, modules.value)
             return await context.send(
                 "turned off protection for **"
@@ -176,24 +264,25 @@ class Antinuke(commands.Cog):
                 flags.do,
             ),
         )
+        await self.load_policies(context.guild.id)
+        await self.bot.chunker.request(context.guild, BACKGROUND, wait=False)
 
         action = ACTIONS.get(flags.do, flags.do.value)
         module_action = MODULES.get(modules, modules.value)
-        threshold_int = int(flags.threshold)
 
         return await context.send(
             "anyone who **"
             + module_action
             + "** "
-            + (str(threshold_int) + " or more " if threshold_int > 1 else "")
+            + (str(flags.threshold) + " or more " if flags.threshold > 1 else "")
             + (
                 "times"
-                if modules not in [Modules.VANITY, Modules.BOTADD] and threshold_int > 1
+                if modules not in [Modules.VANITY, Modules.BOTADD] and flags.threshold > 1
                 else ""
             )
             + (
                 " "
-                if modules not in [Modules.VANITY, Modules.BOTADD] and threshold_int > 1
+                if modules not in [Modules.VANITY, Modules.BOTADD] and flags.threshold > 1
                 else ""
             )
             + "will be **"
@@ -325,25 +414,247 @@ class Antinuke(commands.Cog):
         view.add_item(select)
         return await context.send(overview, view=view)
 
+    @antinuke.group(
+        name="whitelist",
+        aliases=["wl", "trusted"],
+        invoke_without_command=True,
+    )
+    @commands.has_guild_permissions(administrator=True)
+    async def antinuke_whitelist(self, context: Context) -> discord.Message:
+        """
+        View users and roles that bypass the nuke protection
+        """
+        rows = await self.db.fetchall(
+            """
+            SELECT target_id, type
+            FROM antinuke_whitelist
+            WHERE guild_id = ?
+            """,
+            (context.guild.id,),
+        )
+
+        if not rows:
+            return await context.send("nobody is whitelisted yet")
+
+        return await context.send(
+            "whitelisted: "
+            + ", ".join(
+                f"<@&{row[0]}>" if row[1] == Trusted.ROLE.value else f"<@{row[0]}>"
+                for row in rows
+            ),
+            allowed_mentions=discord.AllowedMentions.none(),
+        )
+
+    @antinuke_whitelist.command(
+        name="add",
+        aliases=["trust"],
+    )
+    @commands.has_guild_permissions(administrator=True)
+    @commands.cooldown(1, 4, commands.BucketType.user)
+    async def antinuke_whitelist_add(
+        self,
+        context: Context,
+        *,
+        target: Union[discord.Member, discord.Role, discord.User],
+    ) -> discord.Message:
+        """
+        Let a user or role bypass the nuke protection
+        """
+        if context.author.id not in (context.guild.owner_id, config.Settings.owner_id):
+            return await context.error("only the server owner can manage the whitelist")
+
+        kind = Trusted.ROLE if isinstance(target, discord.Role) else Trusted.USER
+
+        await self.db.execute(
+            """
+            INSERT INTO antinuke_whitelist (
+                guild_id,
+                target_id,
+                type
+            )
+            VALUES (?, ?, ?)
+            ON CONFLICT(guild_id, target_id) DO UPDATE SET
+                type=excluded.type
+            """,
+            (context.guild.id, target.id, kind.value),
+        )
+        self.trusted.add(context.guild.id, target.id)
+
+        return await context.confirm(
+            f"{target.mention} is now whitelisted from the nuke protection"
+        )
+
+    @antinuke_whitelist.command(
+        name="remove",
+        aliases=["untrust", "del"],
+    )
+    @commands.has_guild_permissions(administrator=True)
+    @commands.cooldown(1, 4, commands.BucketType.user)
+    async def antinuke_whitelist_remove(
+        self,
+        context: Context,
+        *,
+        target: Union[discord.Member, discord.Role, discord.User],
+    ) -> discord.Message:
+        """
+        Remove a user or role from the whitelist
+        """
+        if context.author.id not in (context.guild.owner_id, config.Settings.owner_id):
+            return await context.error("only the server owner can manage the whitelist")
+
+        await self.db.execute(
+            """
+            DELETE FROM antinuke_whitelist
+            WHERE guild_id = ?
+            AND target_id = ?
+            """,
+            (context.guild.id, target.id),
+        )
+        self.trusted.remove(context.guild.id, target.id)
+
+        return await context.confirm(
+            f"{target.mention} is no longer whitelisted from the nuke protection"
+        )
+
+    @antinuke.command(
+        name="status",
+        aliases=["queue"],
+    )
+    @commands.has_guild_permissions(administrator=True)
+    @commands.cooldown(1, 4, commands.BucketType.user)
+    async def antinuke_status(self, context: Context) -> discord.Message:
+        """
+        View the event queue for this server
+        """
+        stats = self.dispatcher.stats(context.guild.id)
+
+        return await context.send(
+            f"**{stats['depth']}** events queued"
+            f" ({'processing' if stats['active'] else 'idle'}), "
+            f"**{stats['processed']}** processed, peak depth **{stats['peak']}**"
+        )
+
+    @antinuke.group(
+        name="policy",
+        aliases=["ladder", "escalate"],
+        invoke_without_command=True,
+    )
+    @commands.has_guild_permissions(administrator=True)
+    async def antinuke_policy(
+        self, context: Context, module: Optional[Modules] = None
+    ) -> discord.Message:
+        """
+        View the punishment ladder for a module
+        """
+        if not module:
+            return await context.send_help()
+
+        ladder = self.policies.get((context.guild.id, module.value))
+        if not ladder:
+            return await context.error(
+                f"protection for **{MODULES.get(module, module.value)}** is not enabled"
+            )
+
+        return await context.send(
+            "\n".join(
+                f"**{threshold}** → "
+                + next((v for k, v in ACTIONS.items() if k.value == punishment), punishment)
+                for threshold, punishment in ladder
+            )
+        )
+
+    @antinuke_policy.command(
+        name="add",
+        aliases=["set"],
+    )
+    @commands.has_guild_permissions(administrator=True)
+    @commands.cooldown(1, 4, commands.BucketType.user)
+    async def antinuke_policy_add(
+        self,
+        context: Context,
+        module: Modules,
+        threshold: commands.Range[int, 1, 1000],
+        punishment: Punishment,
+    ) -> discord.Message:
+        """
+        Add an escalation step to a module's punishment ladder
+        """
+        if (context.guild.id, module.value) not in self.policies:
+            return await context.error(
+                f"protection for **{MODULES.get(module, module.value)}** is not enabled"
+            )
+
+        await self.db.execute(
+            """
+            INSERT INTO antinuke_policies (
+                guild_id,
+                module,
+                threshold,
+                punishment
+            )
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(guild_id, module, threshold) DO UPDATE SET
+                punishment=excluded.punishment
+            """,
+            (context.guild.id, module.value, threshold, punishment.value),
+        )
+        await self.load_policies(context.guild.id)
+
+        return await context.confirm(
+            f"anyone who **{MODULES.get(module, module.value)}** {threshold} or more "
+            f"times will be **{ACTIONS.get(punishment, punishment.value)}**"
+        )
+
+    @antinuke_policy.command(
+        name="remove",
+        aliases=["del"],
+    )
+    @commands.has_guild_permissions(administrator=True)
+    @commands.cooldown(1, 4, commands.BucketType.user)
+    async def antinuke_policy_remove(
+        self,
+        context: Context,
+        module: Modules,
+        threshold: int,
+    ) -> discord.Message:
+        """
+        Remove an escalation step from a module's punishment ladder
+        """
+        cursor = await self.db.execute(
+            """
+            DELETE FROM antinuke_policies
+            WHERE guild_id = ?
+            AND module = ?
+            AND threshold = ?
+            """,
+            (context.guild.id, module.value, threshold),
+        )
+
+        if not cursor.rowcount:
+            return await context.error(f"there is no step at **{threshold}**")
+
+        await self.load_policies(context.guild.id)
+        return await context.confirm(f"removed the step at **{threshold}**")
+
     #
     # Listeners
     #
 
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
-        await self.handle_infraction(channel.guild.id, Modules.CHANNELS)
+        self.submit(channel.guild.id, Modules.CHANNELS)
 
     @commands.Cog.listener()
     async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
-        await self.handle_infraction(channel.guild.id, Modules.CHANNELS)
+        self.submit(channel.guild.id, Modules.CHANNELS)
 
     @commands.Cog.listener()
     async def on_guild_role_delete(self, role: discord.Role):
-        await self.handle_infraction(role.guild.id, Modules.ROLES)
+        self.submit(role.guild.id, Modules.ROLES)
 
     @commands.Cog.listener()
     async def on_guild_role_create(self, role: discord.Role):
-        await self.handle_infraction(role.guild.id, Modules.ROLES)
+        self.submit(role.guild.id, Modules.ROLES)
 
     @commands.Cog.listener()
     async def on_guild_emojis_update(
@@ -353,19 +664,22 @@ class Antinuke(commands.Cog):
         after: list[discord.Emoji],
     ):
         if len(before) > len(after):
-            await self.handle_infraction(guild.id, Modules.EMOJIS)
+            self.submit(guild.id, Modules.EMOJIS)
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         if member.bot:
-            await self.handle_infraction(member.guild.id, Modules.BOTADD)
+            self.submit(member.guild.id, Modules.BOTADD)
             
     @commands.Cog.listener()
     async def on_member_ban(self, guild: discord.Guild, user: discord.User):
-        await self.handle_infraction(guild.id, Modules.BAN)
+        self.submit(guild.id, Modules.BAN)
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
+        self.dispatcher.submit(member.guild.id, self.check_kick, member)
+
+    async def check_kick(self, member: discord.Member):
         # we check audit logs first to verify it was actually a kick
         try:
             async for entry in member.guild.audit_logs(limit=1, action=discord.AuditLogAction.kick):
@@ -380,32 +694,26 @@ class Antinuke(commands.Cog):
     # Infraction handler
     #
 
-    async def handle_infraction(self, guild_id: int, module: Modules):
-        row = await self.db.fetchone(
-            """
-            SELECT threshold, punishment
-            FROM antinuke
-            WHERE guild_id = ? 
-            AND module = ?
-            """,
-            (
-                guild_id, 
-                module.value
-            ),
-        )
+    def submit(self, guild_id: int, module: Modules) -> None:
+        """
+        Queue an infraction behind any pending ones for the same guild,
+        so a threshold can only be crossed (and punished) once at a time.
+        """
+        self.dispatcher.submit(guild_id, self.handle_infraction, guild_id, module)
 
-        if not row:
+    async def handle_infraction(self, guild_id: int, module: Modules):
+        ladder = self.policies.get((guild_id, module.value))
+        if not ladder:
             return
 
-        threshold = int(row[0])
-        punishment = row[1]
-
         count = self.tracker.record(guild_id, module.value)
 
-        if count < threshold:
+        punishment = ladder.step(count)
+        if punishment is None:
             return
 
-        self.tracker.reset(guild_id, module.value)
+        if count >= ladder.top:
+            self.tracker.reset(guild_id, module.value)
 
         guild = self.bot.get_guild(guild_id)
         if not guild:
@@ -428,6 +736,9 @@ class Antinuke(commands.Cog):
             if perpetrator == self.bot.user or perpetrator == guild.owner:
                 return
 
+            if self.trusted.is_trusted(guild_id, perpetrator):
+                return
+
             try:
                 await self.punish(guild, perpetrator, punishment, module)
             except (discord.Forbidden, discord.HTTPException):
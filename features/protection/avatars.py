@@ -0,0 +1,95 @@
+from typing import Optional
+
+from array import array
+from collections import OrderedDict
+from io import BytesIO
+
+from PIL import Image
+
+
+DISTANCE = 6
+
+
+def dhash(data: bytes, size: int = 8) -> int:
+    """
+    64-bit difference hash of an image.
+
+    The image is shrunk to greyscale ``(size + 1) x size`` and each bit
+    records whether a pixel is brighter than its right neighbour, so
+    re-encoded or slightly resized copies hash to nearby values. Blocking;
+    meant to run in an executor.
+    """
+    with Image.open(BytesIO(data)) as image:
+        pixels = list(
+            image.convert("L").resize((size + 1, size), Image.Resampling.LANCZOS).getdata()
+        )
+
+    bits = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+
+class AvatarIndex:
+    """
+    Recent joiner avatar hashes for one guild.
+
+    Hashes are kept in a fixed ring for matching, and an LRU keyed by
+    Discord's avatar hash means an image that was already downloaded is
+    never fetched or hashed again.
+    """
+
+    SIZE = 256
+
+    __slots__ = ("hashes", "times", "head", "filled", "cache")
+
+    def __init__(self):
+        self.hashes = array("Q", bytes(8 * self.SIZE))
+        self.times = array("d", bytes(8 * self.SIZE))
+        self.head = -1
+        self.filled = 0
+        self.cache: OrderedDict[str, int] = OrderedDict()
+
+    def cached(self, key: str) -> Optional[int]:
+        value = self.cache.get(key)
+        if value is not None:
+            self.cache.move_to_end(key)
+        return value
+
+    def add(
+        self,
+        key: str,
+        value: int,
+        now: float,
+        window: float = 600.0,
+        limit: int = SIZE,
+    ) -> int:
+        """
+        Index *value* and return how many joiners from the last *window*
+        seconds had a near-identical avatar, counting no further than *limit*.
+        """
+        self.cache[key] = value
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.SIZE:
+            self.cache.popitem(last=False)
+
+        since = now - window
+        matches = 0
+        for offset in range(self.filled):
+            slot = (self.head - offset) % self.SIZE
+            if self.times[slot] < since:
+                break
+
+            if bin(self.hashes[slot] ^ value).count("1") <= DISTANCE:
+                matches += 1
+                if matches >= limit:
+                    break
+
+        self.head = (self.head + 1) % self.SIZE
+        self.hashes[self.head] = value
+        self.times[self.head] = now
+        self.filled = min(self.filled + 1, self.SIZE)
+
+        return matches
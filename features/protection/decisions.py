@@ -0,0 +1,86 @@
+from typing import Optional
+
+from array import array
+
+
+RETENTION = 90 * 86400
+RULES = ("age", "avatar", "similar", "duplicates", "raid")
+THRESHOLDS = (
+    ("1h", 3600),
+    ("1d", 86400),
+    ("1w", 604800),
+    ("30d", 2592000),
+    ("90d", 7776000),
+    ("1y", 31536000),
+)
+
+
+class DecisionLog:
+    """
+    Append-only buffer of join gate decisions, one array per column.
+
+    Joins are appended in O(1) without building row objects and are
+    written to join_gate_log in a single ``executemany`` when drained.
+    At most ``LIMIT`` decisions are held, later ones are counted in
+    ``dropped`` instead, so a database outage can't grow it forever.
+    """
+
+    LIMIT = 50_000
+
+    __slots__ = ("guilds", "times", "ages", "avatars", "rules", "dry", "dropped")
+
+    def __init__(self):
+        self.dropped = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.guilds = array("q")
+        self.times = array("q")
+        self.ages = array("q")
+        self.avatars = array("B")
+        self.rules = array("b")
+        self.dry = array("B")
+
+    def append(
+        self,
+        guild_id: int,
+        joined_at: float,
+        account_age: float,
+        avatar: bool,
+        rule: Optional[str],
+        dry_run: bool,
+    ) -> bool:
+        if len(self.guilds) >= self.LIMIT:
+            self.dropped += 1
+            return False
+
+        self.guilds.append(guild_id)
+        self.times.append(int(joined_at))
+        self.ages.append(int(account_age))
+        self.avatars.append(avatar)
+        self.rules.append(RULES.index(rule) if rule else -1)
+        self.dry.append(dry_run)
+        return True
+
+    def drain(self) -> list[tuple]:
+        """
+        Return buffered decisions as rows and clear the buffer.
+        """
+        rows = [
+            (guild, joined, age, avatar, RULES[rule] if rule >= 0 else None, dry)
+            for guild, joined, age, avatar, rule, dry in zip(
+                self.guilds, self.times, self.ages, self.avatars, self.rules, self.dry
+            )
+        ]
+        self._reset()
+        return rows
+
+    def restore(self, rows: list[tuple]) -> None:
+        """
+        Put drained rows back after a failed write.
+        """
+        for row in rows:
+            self.append(*row)
+
+    def __len__(self) -> int:
+        return len(self.guilds)
@@ -1,21 +1,79 @@
 from typing import Optional
 
-from discord.ext import commands
-from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from discord.ext import commands, tasks
+from datetime import timedelta
+from time import monotonic, time
 
+import asyncio
 import discord
+import logging
 
 from bot import Bot
 from helpers.context import Context
 from helpers.converters import Duration
+from helpers.enforcement import Enforcer
 
+from .avatars import AvatarIndex, dhash
+from .decisions import RETENTION, RULES, THRESHOLDS, DecisionLog
 from .models import Punishment
+from .raid import AGE_LABELS, JoinWindow, RaidRules
+from .rules import GateConfig, GateRules
+from .similarity import NameIndex
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+INTENTS = discord.Intents(members=True)
+
+# join_gate columns added after the table was first shipped
+COLUMNS = {
+    "similar": "INTEGER DEFAULT 0",
+    "duplicates": "INTEGER DEFAULT 0",
+    "dry_run": "INTEGER DEFAULT 0",
+}
 
 
 class Flags(commands.FlagConverter, prefix="--", delimiter=" "):
     age: Optional[str] = commands.flag(default=None, description="Account age")
-    avatar: Optional[bool] = commands.flag(default=False, description="Check for default avatar")
-    do: Optional[Punishment] = commands.flag(default=Punishment.KICK, description="Action to take")
+    avatar: Optional[bool] = commands.flag(default=None, description="Check for default avatar")
+    do: Optional[Punishment] = commands.flag(default=None, description="Action to take")
+    similar: Optional[commands.Range[int, 1, NameIndex.SIZE]] = commands.flag(default=None, description="Recent joiners with a similar username before acting")
+    duplicates: Optional[commands.Range[int, 1, AvatarIndex.SIZE]] = commands.flag(default=None, description="Recent joiners with the same avatar before acting")
+    dryrun: Optional[bool] = commands.flag(default=None, description="Log decisions without acting on them")
+
+
+ACTIONS = {
+    Punishment.BAN: "banned",
+    Punishment.KICK: "kicked",
+    Punishment.TIMEOUT: "timed out",
+}
+
+
+def describe(config: GateConfig) -> str:
+    return (
+        f" with action: **{config.action.value}**"
+        + (f" and age requirement: **{config.age}**" if config.age else "")
+        + (" and default avatar check: **enabled**" if config.avatar else "")
+        + (
+            f" and similar username limit: **{config.similar}**"
+            if config.similar
+            else ""
+        )
+        + (
+            f" and duplicate avatar limit: **{config.duplicates}**"
+            if config.duplicates
+            else ""
+        )
+        + (" in **dry run** mode" if config.dry_run else "")
+    )
+
+
+class RaidFlags(commands.FlagConverter, prefix="--", delimiter=" "):
+    joins: commands.Range[int, 3, JoinWindow.SIZE] = commands.flag(default=10, description="Joins that count as a raid")
+    seconds: commands.Range[int, 1, 300] = commands.flag(default=10, description="Window the joins are counted over")
+    lockdown: Optional[str] = commands.flag(default="10m", description="How long lockdown lasts")
+    do: Optional[Punishment] = commands.flag(default=Punishment.KICK, description="Action to take during lockdown")
 
 
 class Gate(commands.Cog):
@@ -26,6 +84,204 @@ class Gate(commands.Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
         self.db = bot.db
+        self.rules: dict[int, GateRules] = {}
+        self.raid: dict[int, RaidRules] = {}
+        self.windows: dict[int, JoinWindow] = {}
+        self.lockdowns: dict[int, float] = {}
+        self.names: dict[int, NameIndex] = {}
+        self.avatars: dict[int, AvatarIndex] = {}
+        self.downloads = asyncio.Semaphore(8)
+        self.hasher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="avatar-hash")
+        self.enforcer = Enforcer("gate")
+        self.decisions = DecisionLog()
+        self.flush_loop.start()
+        self.prune_loop.start()
+        self.refresh_loop.start()
+
+    async def cog_load(self) -> None:
+        await self.migrate()
+        await self.load_rules()
+        await self.load_raid()
+
+    async def cog_unload(self) -> None:
+        self.flush_loop.cancel()
+        self.prune_loop.cancel()
+        self.refresh_loop.cancel()
+        await self.flush()
+        self.rules.clear()
+        self.raid.clear()
+        self.windows.clear()
+        self.lockdowns.clear()
+        self.names.clear()
+        self.avatars.clear()
+        self.hasher.shutdown(wait=False, cancel_futures=True)
+        self.enforcer.close()
+
+    @tasks.loop(seconds=15)
+    async def flush_loop(self):
+        await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Write buffered join decisions to join_gate_log in one transaction
+        """
+        if self.decisions.dropped:
+            logger.warning(f"Dropped {self.decisions.dropped} join gate decisions, the buffer was full")
+            self.decisions.dropped = 0
+
+        if not self.decisions:
+            return
+
+        rows = self.decisions.drain()
+        try:
+            await self.db.executemany(
+                """
+                INSERT INTO join_gate_log (
+                    guild_id,
+                    joined_at,
+                    account_age,
+                    avatar,
+                    rule,
+                    dry_run
+                )
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+        except Exception:
+            logger.exception(f"Failed to write {len(rows)} join gate decisions")
+            # retried on the next flush, the buffer limit caps how many are kept
+            self.decisions.restore(rows)
+
+    @tasks.loop(hours=24)
+    async def prune_loop(self):
+        try:
+            await self.db.execute(
+                """
+                DELETE FROM join_gate_log
+                WHERE joined_at < ?
+                """,
+                (int(time()) - RETENTION,),
+            )
+        except Exception:
+            logger.exception("Failed to prune join_gate_log")
+
+    @tasks.loop(minutes=1)
+    async def refresh_loop(self):
+        # picks up settings changed through the API
+        await self.load_rules()
+
+    @refresh_loop.before_loop
+    async def before_refresh(self):
+        await asyncio.sleep(60)
+
+    async def migrate(self) -> None:
+        """
+        Add join_gate columns missing from databases created before them
+        """
+        rows = await self.db.fetchall("PRAGMA table_info(join_gate)")
+        existing = {row[1] for row in rows}
+        if not existing:
+            return
+
+        for column, definition in COLUMNS.items():
+            if column not in existing:
+                await self.db.execute(
+                    f"ALTER TABLE join_gate ADD COLUMN {column} {definition}"
+                )
+                logger.info(f"Added join_gate.{column}")
+
+    async def load_rules(self, guild_id: Optional[int] = None) -> None:
+        """
+        Compile join gate rules for every guild, or only *guild_id*
+        """
+        rows = await self.db.fetchall(
+            """
+            SELECT guild_id, age, avatar, action, similar, duplicates, dry_run
+            FROM join_gate
+            WHERE ? IS NULL
+            OR guild_id = ?
+            """,
+            (guild_id, guild_id),
+        )
+        rules = {row[0]: GateConfig.from_row(tuple(row)[1:]).compile() for row in rows}
+
+        if guild_id is None:
+            self.rules = rules
+            self.names = {
+                guild: index
+                for guild, index in self.names.items()
+                if guild in rules and rules[guild].similar
+            }
+            self.avatars = {
+                guild: index
+                for guild, index in self.avatars.items()
+                if guild in rules and rules[guild].duplicates
+            }
+            return
+
+        self.rules.pop(guild_id, None)
+        self.rules.update(rules)
+        if guild_id not in rules or not rules[guild_id].similar:
+            self.names.pop(guild_id, None)
+        if guild_id not in rules or not rules[guild_id].duplicates:
+            self.avatars.pop(guild_id, None)
+
+    async def avatar_hash(self, member: discord.Member, index: AvatarIndex) -> Optional[int]:
+        """
+        Perceptual hash of a member's avatar, downloading through a bounded
+        pool and hashing in a worker thread so the event loop never blocks
+        """
+        cached = index.cached(member.avatar.key)
+        if cached is not None:
+            return cached
+
+        async with self.downloads:
+            try:
+                data = await member.avatar.with_static_format("png").with_size(64).read()
+            except (discord.HTTPException, discord.NotFound):
+                return None
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.hasher, dhash, data)
+        except Exception:
+            return None
+
+    async def load_raid(self, guild_id: Optional[int] = None) -> None:
+        """
+        Compile raid detection settings for every guild, or only *guild_id*
+        """
+        rows = await self.db.fetchall(
+            """
+            SELECT guild_id, joins, seconds, lockdown, action
+            FROM join_raid
+            WHERE ? IS NULL
+            OR guild_id = ?
+            """,
+            (guild_id, guild_id),
+        )
+        raid = {row[0]: RaidRules(row[1], row[2], row[3], row[4]) for row in rows}
+
+        if guild_id is None:
+            self.raid = raid
+            return
+
+        self.raid.pop(guild_id, None)
+        self.raid.update(raid)
+        if guild_id not in raid:
+            self.windows.pop(guild_id, None)
+            self.lockdowns.pop(guild_id, None)
+
+    def locked(self, guild_id: int) -> bool:
+        until = self.lockdowns.get(guild_id)
+        if until is None:
+            return False
+
+        if monotonic() < until:
+            return True
+
+        del self.lockdowns[guild_id]
+        return False
 
 
     @commands.group(
@@ -58,35 +314,22 @@ class Gate(commands.Cog):
         """
         Enable the join gate
         """
-        print(flags)
-        await self.db.execute(
-            """
-            INSERT INTO join_gate (guild_id, age, avatar, action)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT (guild_id) 
-            DO UPDATE SET 
-                age = excluded.age,
-                avatar = excluded.avatar,
-                action = excluded.action
-            """,
-            (
-                context.guild.id,
-                flags.age,
-                int(flags.avatar),
-                flags.action.value if flags.action else None,
+        try:
+            config = GateConfig(
+                age=flags.age,
+                avatar=flags.avatar,
+                action=flags.do,
+                similar=flags.similar,
+                duplicates=flags.duplicates,
+                dry_run=flags.dryrun,
             )
-        )
+        except ValueError as error:
+            return await context.error(str(error))
 
-        return await context.confirm(
-            f"join gate has been enabled"
-            + (f" with age requirement: **{flags.age}**" if flags.age else "")
-            + (f" and action: **{flags.action.value}**" if flags.action else "")
-            + (
-                f" and default avatar check: **enabled**"
-                if flags.avatar
-                else ""
-            )
-        )
+        await config.save(self.db, context.guild.id)
+        await self.load_rules(context.guild.id)
+
+        return await context.confirm("join gate has been enabled" + describe(config))
 
 
     @gate.command(name="edit")
@@ -96,43 +339,26 @@ class Gate(commands.Cog):
         """
         Edit the join gate settings
         """
-        existing = await self.db.fetchone(
-            """
-            SELECT *
-            FROM join_gate 
-            WHERE guild_id = ?
-            """, 
-            (context.guild.id,)
-        )
-
+        existing = await GateConfig.fetch(self.db, context.guild.id)
         if not existing:
             return await context.error("join gate is not enabled")
 
-        await self.db.execute(
-            """
-            UPDATE join_gate
-            SET age = COALESCE(?, age),
-                avatar = COALESCE(?, avatar),
-                action = COALESCE(?, action)
-            WHERE guild_id = ?
-            """,
-            (
-                flags.age,
-                int(flags.avatar) if flags.avatar is not None else None,
-                flags.action.value if flags.action else None,
-                context.guild.id,
+        try:
+            config = existing.merge(
+                age=flags.age,
+                avatar=flags.avatar,
+                action=flags.do,
+                similar=flags.similar,
+                duplicates=flags.duplicates,
+                dry_run=flags.dryrun,
             )
-        )
+        except ValueError as error:
+            return await context.error(str(error))
 
-        return await context.confirm(
-            f"join gate has been enabled with age requirement: **{flags.age}**"
-            + (f" and action: **{flags.action.value}**" if flags.action else "")
-            + (
-                f" and default avatar check: **{flags.avatar}**"
-                if flags.avatar is not None
-                else ""
-            )
-        )
+        await config.save(self.db, context.guild.id)
+        await self.load_rules(context.guild.id)
+
+        return await context.confirm("join gate has been updated" + describe(config))
 
 
     @gate.command(
@@ -145,13 +371,8 @@ class Gate(commands.Cog):
         """
         Disable the join gate
         """
-        await self.db.execute(
-            """
-            DELETE FROM join_gate 
-            WHERE guild_id = ?
-            """,
-            (context.guild.id,)
-        )
+        await GateConfig.delete(self.db, context.guild.id)
+        await self.load_rules(context.guild.id)
 
         return await context.confirm("join gate has been disabled")
 
@@ -166,85 +387,332 @@ class Gate(commands.Cog):
         """
         View the join gate settings
         """
-        settings = await self.db.fetchone(
+        config = await GateConfig.fetch(self.db, context.guild.id)
+        if not config:
+            return await context.error("join gate is not enabled")
+
+        conditions = []
+        if config.age:
+            conditions.append(f"account age below **{config.age}**")
+        if config.avatar:
+            conditions.append("**no avatar**")
+        if config.similar:
+            conditions.append(f"**{config.similar}** or more recent joiners with a similar username")
+        if config.duplicates:
+            conditions.append(f"**{config.duplicates}** or more recent joiners with the same avatar")
+
+        return await context.send(
+            (
+                f"users with {' or '.join(conditions)} will be **{ACTIONS.get(config.action, 'kicked')}**"
+                if conditions
+                else "No restrictions configured"
+            )
+            + (" (**dry run**, decisions are only logged)" if config.dry_run else "")
+        )
+
+
+    @gate.command(
+        name="stats",
+        aliases=["analytics"]
+    )
+    @commands.has_guild_permissions(administrator=True)
+    @commands.cooldown(1, 4, commands.BucketType.user)
+    async def gate_stats(
+        self,
+        context: Context,
+        days: commands.Range[int, 1, 90] = 7,
+    ) -> discord.Message:
+        """
+        Show how many recent joins each rule and age threshold would block
+        """
+        await self.flush()
+
+        # aggregation happens inside SQLite, no rows are pulled into Python
+        totals = await self.db.fetchone(
+            f"""
+            SELECT
+                COUNT(*),
+                SUM(avatar = 0),
+                {", ".join(f"SUM(account_age < {seconds})" for _, seconds in THRESHOLDS)}
+            FROM join_gate_log
+            WHERE guild_id = ?
+            AND joined_at >= ?
+            """,
+            (context.guild.id, int(time()) - days * 86400),
+        )
+
+        if not totals or not totals[0]:
+            return await context.error(f"no joins were logged in the last {days} days")
+
+        hits = await self.db.fetchall(
             """
-            SELECT age, avatar, action
-            FROM join_gate 
+            SELECT rule, COUNT(*), SUM(dry_run)
+            FROM join_gate_log
             WHERE guild_id = ?
+            AND joined_at >= ?
+            AND rule IS NOT NULL
+            GROUP BY rule
             """,
-            (context.guild.id,)
+            (context.guild.id, int(time()) - days * 86400),
         )
 
-        if not settings:
-            return await context.error("join gate is not enabled")
+        joins, no_avatar, *ages = totals
+        matched = {row[0]: (row[1], row[2]) for row in hits}
 
-        age_requirement, avatar_check, action = settings
-        try:
-            action = Punishment(action) if action else Punishment.KICK
-        except (ValueError, KeyError):
-            action = Punishment.KICK
+        return await context.send(
+            f"**{joins:,}** joins in the last {days} days\n"
+            + "accounts younger than: "
+            + ", ".join(
+                f"{label} **{count or 0:,}**" for (label, _), count in zip(THRESHOLDS, ages)
+            )
+            + f"\nno avatar: **{no_avatar or 0:,}**"
+            + (
+                "\nrules hit: "
+                + ", ".join(
+                    f"{rule} **{matched[rule][0]:,}**"
+                    + (f" ({matched[rule][1]:,} dry run)" if matched[rule][1] else "")
+                    for rule in RULES
+                    if rule in matched
+                )
+                if matched
+                else ""
+            )
+        )
 
-        conditions = []
-        if age_requirement:
-            conditions.append(f"account age below **{age_requirement}**")
-        if avatar_check:
-            conditions.append("**no avatar**")
 
-        action_text = {
-            Punishment.BAN: "banned",
-            Punishment.KICK: "kicked",
-            Punishment.MUTE: "muted",
-            Punishment.TIMEOUT: "timed out"
-        }.get(action, "kicked")
+    @gate.group(
+        name="raid",
+        aliases=["antiraid"],
+        invoke_without_command=True
+    )
+    @commands.has_guild_permissions(administrator=True)
+    @commands.cooldown(1, 4, commands.BucketType.user)
+    async def gate_raid(self, context: Context) -> discord.Message:
+        """
+        View raid detection settings and recent join activity
+        """
+        raid = self.raid.get(context.guild.id)
+        if not raid:
+            return await context.error("raid detection is not enabled")
+
+        status = (
+            f"lockdown ends <t:{int(time() + self.lockdowns[context.guild.id] - monotonic())}:R>"
+            if self.locked(context.guild.id)
+            else "not in lockdown"
+        )
+
+        window = self.windows.get(context.guild.id)
+        slots = list(window.recent(monotonic() - raid.seconds)) if window else []
+        activity = ""
+        if slots:
+            ages, similar = window.histograms(slots)
+            activity = (
+                f"\n**{len(slots)}** joins in the last {raid.seconds}s, account ages: "
+                + ", ".join(
+                    f"<{label} **{count}**" if label != "older" else f"older **{count}**"
+                    for label, count in zip(AGE_LABELS, ages)
+                    if count
+                )
+                + f", largest similar name group: **{similar}**"
+            )
+
+        enforced = self.enforcer.stats(context.guild.id)
+        if enforced["done"] or enforced["queued"]:
+            activity += (
+                f"\n**{enforced['done']}** joins actioned ({enforced['rate']:.1f}/s), "
+                f"**{enforced['queued']}** queued, **{enforced['failed']}** failed"
+            )
 
         return await context.send(
-            f"users with {' or '.join(conditions)} will be **{action_text}**"
-            if conditions
-            else "No restrictions configured"
+            f"**{raid.joins}** joins within **{raid.seconds}s** starts a lockdown for "
+            f"**{timedelta(seconds=raid.lockdown)}**, joins are **{ACTIONS.get(raid.action, 'kicked')}**, {status}"
+            + activity
         )
 
 
-    @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member) -> None:
-        settings = await self.db.fetchone(
+    @gate_raid.command(
+        name="on",
+        aliases=["enable", "edit"]
+    )
+    @commands.has_guild_permissions(administrator=True)
+    @commands.cooldown(1, 4, commands.BucketType.user)
+    async def gate_raid_on(self, context: Context, *, flags: RaidFlags) -> discord.Message:
+        """
+        Enable raid detection
+        """
+        if flags.lockdown:
+            try:
+                lockdown = Duration.parse_to_timedelta(flags.lockdown)
+            except ValueError:
+                lockdown = timedelta()
+            if not lockdown:
+                return await context.error(f"invalid lockdown duration: {flags.lockdown}")
+
+        await self.db.execute(
             """
-            SELECT age, avatar, action
-            FROM join_gate 
+            INSERT INTO join_raid (guild_id, joins, seconds, lockdown, action)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (guild_id)
+            DO UPDATE SET
+                joins = excluded.joins,
+                seconds = excluded.seconds,
+                lockdown = excluded.lockdown,
+                action = excluded.action
+            """,
+            (
+                context.guild.id,
+                flags.joins,
+                flags.seconds,
+                flags.lockdown,
+                flags.do.value if flags.do else None,
+            )
+        )
+        await self.load_raid(context.guild.id)
+
+        return await context.confirm(
+            f"raid detection has been enabled, **{flags.joins}** joins within "
+            f"**{flags.seconds}s** will start a lockdown"
+        )
+
+
+    @gate_raid.command(
+        name="off",
+        aliases=["disable"]
+    )
+    @commands.has_guild_permissions(administrator=True)
+    @commands.cooldown(1, 4, commands.BucketType.user)
+    async def gate_raid_off(self, context: Context) -> discord.Message:
+        """
+        Disable raid detection
+        """
+        await self.db.execute(
+            """
+            DELETE FROM join_raid
             WHERE guild_id = ?
             """,
-            (member.guild.id,)
+            (context.guild.id,)
         )
+        await self.load_raid(context.guild.id)
 
-        if not settings:
+        return await context.confirm("raid detection has been disabled")
+
+
+    @gate_raid.command(
+        name="lift",
+        aliases=["end", "unlock"]
+    )
+    @commands.has_guild_permissions(administrator=True)
+    @commands.cooldown(1, 4, commands.BucketType.user)
+    async def gate_raid_lift(self, context: Context) -> discord.Message:
+        """
+        End an active lockdown
+        """
+        if not self.lockdowns.pop(context.guild.id, None):
+            return await context.error("this server is not in lockdown")
+
+        return await context.confirm("lockdown has been lifted")
+
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member) -> None:
+        rules = self.rules.get(member.guild.id)
+        raid = self.raid.get(member.guild.id)
+        if not rules and not raid:
             return
 
-        age_requirement, avatar_check, action = settings
-        action = Punishment(action) if action else Punishment.KICK
-
-        reason = None
-
-        if age_requirement:
-            try:                
-                duration = Duration.parse_to_timedelta(age_requirement)
-                min_account_age = datetime.now(timezone.utc) - duration
-                
-                if member.created_at > min_account_age:
-                    reason = f"join gate: Account must be older than {age_requirement}"
-            except Exception:
-                pass
-
-        if not reason and avatar_check and member.avatar is None:
-            reason = "join gate: Default avatar not allowed"
-
-        if reason:
-            actions = {
-                Punishment.BAN: lambda: member.ban(reason=reason),
-                Punishment.MUTE: lambda: member.timeout(timedelta(days=28), reason=reason),
-                Punishment.TIMEOUT: lambda: member.timeout(timedelta(days=28), reason=reason),
-                Punishment.KICK: lambda: member.kick(reason=reason),
-            }
-            action_func = actions.get(action, actions[Punishment.KICK])
-            await action_func()
+        created = ((member.id >> 22) + discord.utils.DISCORD_EPOCH) / 1000
+        account_age = time() - created
+
+        verdict = await self.evaluate(member, rules, raid, account_age)
+        dry_run = bool(rules and rules.dry_run)
+
+        if rules:
+            self.decisions.append(
+                member.guild.id,
+                time(),
+                account_age,
+                member.avatar is not None,
+                verdict[0] if verdict else None,
+                dry_run,
+            )
+
+        if verdict and not dry_run:
+            _, reason, action = verdict
+            await self.enforce(member, action, reason)
+
+    async def evaluate(
+        self,
+        member: discord.Member,
+        rules: Optional[GateRules],
+        raid: Optional[RaidRules],
+        account_age: float,
+    ) -> Optional[tuple[str, str, Punishment]]:
+        """
+        Return the rule a join hits, its reason and the action to take
+        """
+        now = monotonic()
+
+        if raid:
+            if self.locked(member.guild.id):
+                return "raid", "join gate: Raid lockdown", raid.action
+
+            window = self.windows.get(member.guild.id)
+            if window is None:
+                window = self.windows[member.guild.id] = JoinWindow()
+
+            window.push(now, account_age, member.name)
+
+            if raid.is_raid(window, now):
+                self.lockdowns[member.guild.id] = now + raid.lockdown
+                return "raid", "join gate: Raid lockdown", raid.action
+
+        if not rules:
+            return None
+
+        failed = rules.check(member, account_age)
+
+        if rules.similar:
+            index = self.names.get(member.guild.id)
+            if index is None:
+                index = self.names[member.guild.id] = NameIndex()
+
+            # every join is indexed so the cluster is visible to later joins
+            similar = index.add(member.name, now, limit=rules.similar)
+            if not failed and similar >= rules.similar:
+                failed = "similar", "join gate: Similar username to recent joins"
+
+        if failed:
+            return *failed, rules.action
+
+        if rules.duplicates and member.avatar:
+            index = self.avatars.get(member.guild.id)
+            if index is None:
+                index = self.avatars[member.guild.id] = AvatarIndex()
+
+            value = await self.avatar_hash(member, index)
+            if value is not None:
+                duplicates = index.add(
+                    member.avatar.key, value, now, limit=rules.duplicates
+                )
+                if duplicates >= rules.duplicates:
+                    return "duplicates", "join gate: Avatar matches recent joins", rules.action
+
+        return None
+
+    async def enforce(
+        self,
+        member: discord.Member,
+        action: Punishment,
+        reason: str,
+    ) -> None:
+        """
+        Queue the action so the listener never waits on REST, and bursts
+        of bans go out through the bulk-ban endpoint
+        """
+        if action not in (Punishment.BAN, Punishment.TIMEOUT):
+            action = Punishment.KICK
+
+        self.enforcer.submit(member.guild, member, action.value, reason)
 
 
 async def setup(bot: Bot) -> None:
@@ -7,4 +7,9 @@ class Punishment(str, Enum):
     MUTE = "timeout"
     TIMEOUT = "timeout"
     STRIP = "strip"
-    STRIPSTAFF = "stripstaff"
\ No newline at end of file
+    STRIPSTAFF = "stripstaff"
+
+
+class Trusted(str, Enum):
+    USER = "user"
+    ROLE = "role"
\ No newline at end of file
@@ -0,0 +1,85 @@
+from typing import Iterable, Optional
+
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+
+import logging
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# thresholds are stored in an array('I')
+MAX_THRESHOLD = 2**32 - 1
+
+
+class Ladder:
+    """
+    Escalating punishment ladder for a single (guild_id, module).
+
+    Steps are compiled into a sorted ``array('I')`` of thresholds with a
+    parallel tuple of punishments, so finding the stage for a rolling
+    count is a binary search.
+    """
+
+    __slots__ = ("thresholds", "punishments")
+
+    def __init__(self, steps: Iterable[tuple[int, str]]):
+        # later steps for the same threshold win
+        ordered = sorted(dict(steps).items())
+        self.thresholds = array("I", (threshold for threshold, _ in ordered))
+        self.punishments = tuple(punishment for _, punishment in ordered)
+
+    def step(self, count: int) -> Optional[str]:
+        """
+        Return the punishment for the stage *count* has just reached,
+        or None if *count* sits between stages. Any count at or past the
+        final stage returns it, so a ladder lowered while a count is
+        already above its top still fires.
+        """
+        if count >= self.top:
+            return self.punishments[-1]
+
+        index = bisect_right(self.thresholds, count) - 1
+        if index < 0 or self.thresholds[index] != count:
+            return None
+        return self.punishments[index]
+
+    @property
+    def top(self) -> int:
+        """
+        Threshold of the final stage.
+        """
+        return self.thresholds[-1]
+
+    def __iter__(self):
+        return zip(self.thresholds, self.punishments)
+
+    def __len__(self) -> int:
+        return len(self.thresholds)
+
+
+def compile_ladders(
+    rows: Iterable[tuple[int, str, int, str]],
+) -> dict[tuple[int, str], Ladder]:
+    """
+    Group (guild_id, module, threshold, punishment) rows into ladders.
+    Rows whose threshold isn't a positive integer are skipped, so one bad
+    row can't stop every other guild's policies from loading.
+    """
+    grouped: dict[tuple[int, str], list[tuple[int, str]]] = defaultdict(list)
+    for guild_id, module, threshold, punishment in rows:
+        try:
+            value = int(threshold)
+        except (TypeError, ValueError):
+            value = 0
+
+        if not 1 <= value <= MAX_THRESHOLD:
+            logger.warning(
+                f"Skipping {module} step in {guild_id} with invalid threshold {threshold!r}"
+            )
+            continue
+
+        grouped[(guild_id, module)].append((value, punishment))
+
+    return {key: Ladder(steps) for key, steps in grouped.items()}
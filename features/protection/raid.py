@@ -0,0 +1,130 @@
+from typing import Iterator, Optional
+
+from array import array
+from collections import Counter
+from string import digits, punctuation, whitespace
+
+import zlib
+
+from helpers.converters import Duration
+
+from .models import Punishment
+
+
+AGE_BINS = (3600, 86400, 604800, 2592000, 31536000)
+AGE_LABELS = ("1h", "1d", "1w", "30d", "1y", "older")
+
+_STRIP = str.maketrans("", "", digits + punctuation + whitespace)
+
+
+def skeleton(name: str) -> int:
+    """
+    Hash of a username with digits, punctuation and spaces removed,
+    so ``user1234`` and ``user_1235`` land on the same value.
+    """
+    return zlib.crc32(name.lower().translate(_STRIP).encode())
+
+
+def age_bin(seconds: float) -> int:
+    for index, limit in enumerate(AGE_BINS):
+        if seconds < limit:
+            return index
+    return len(AGE_BINS)
+
+
+class JoinWindow:
+    """
+    Fixed-size ring buffer of recent joins for a single guild.
+
+    Each slot holds the join time, an account-age bin and a username
+    skeleton hash in parallel arrays, so a guild costs a few kilobytes
+    however large the raid is.
+    """
+
+    SIZE = 256
+
+    __slots__ = ("times", "ages", "names", "head", "filled")
+
+    def __init__(self):
+        self.times = array("d", bytes(8 * self.SIZE))
+        self.ages = array("B", bytes(self.SIZE))
+        self.names = array("I", bytes(4 * self.SIZE))
+        self.head = -1
+        self.filled = 0
+
+    def push(self, now: float, age: float, name: str) -> None:
+        self.head = (self.head + 1) % self.SIZE
+        self.times[self.head] = now
+        self.ages[self.head] = age_bin(age)
+        self.names[self.head] = skeleton(name)
+        self.filled = min(self.filled + 1, self.SIZE)
+
+    def recent(self, since: float) -> Iterator[int]:
+        """
+        Yield slots joined at or after *since*, newest first.
+        """
+        for offset in range(self.filled):
+            slot = (self.head - offset) % self.SIZE
+            if self.times[slot] < since:
+                return
+            yield slot
+
+    def histograms(self, slots: list[int]) -> tuple[list[int], int]:
+        """
+        Return the account-age histogram over *slots* and the size of the
+        largest group sharing a username skeleton.
+        """
+        ages = [0] * (len(AGE_BINS) + 1)
+        for slot in slots:
+            ages[self.ages[slot]] += 1
+
+        names = Counter(self.names[slot] for slot in slots)
+        return ages, max(names.values(), default=0)
+
+
+class RaidRules:
+    """
+    Raid detection settings for a guild, compiled from its join_raid row.
+
+    A guild is considered raided when ``joins`` members join within
+    ``seconds``, or when half that many join and most of them are under a
+    week old or share a username pattern.
+    """
+
+    __slots__ = ("joins", "seconds", "lockdown", "action")
+
+    def __init__(
+        self,
+        joins: int = 10,
+        seconds: int = 10,
+        lockdown: Optional[str] = "10m",
+        action: Optional[str] = None,
+    ):
+        self.joins = int(joins)
+        self.seconds = int(seconds)
+
+        self.lockdown: float = 600.0
+        if lockdown:
+            try:
+                self.lockdown = Duration.parse_to_timedelta(lockdown).total_seconds()
+            except ValueError:
+                pass
+
+        try:
+            self.action = Punishment(action) if action else Punishment.KICK
+        except ValueError:
+            self.action = Punishment.KICK
+
+    def is_raid(self, window: JoinWindow, now: float) -> bool:
+        slots = list(window.recent(now - self.seconds))
+        count = len(slots)
+
+        if count >= self.joins:
+            return True
+
+        if count < 2 or count * 2 < self.joins:
+            return False
+
+        ages, similar = window.histograms(slots)
+        young = sum(ages[:3])
+        return young * 4 >= count * 3 or similar * 2 >= count
@@ -0,0 +1,202 @@
+from typing import Optional
+
+import discord
+
+from helpers.converters import Duration
+from helpers.database import Database
+
+from .models import Punishment
+
+
+class GateRules:
+    """
+    Join gate rules for a guild, compiled once from its join_gate row.
+
+    The age requirement is parsed up front into seconds and compared with
+    the account age read straight off the snowflake, so evaluating a join
+    is a couple of comparisons with no database access or regex parsing.
+    """
+
+    __slots__ = ("age", "min_age", "avatar", "action", "similar", "duplicates", "dry_run")
+
+    def __init__(
+        self,
+        age: Optional[str] = None,
+        avatar: bool = False,
+        action: Optional[str] = None,
+        similar: Optional[int] = 0,
+        duplicates: Optional[int] = 0,
+        dry_run: bool = False,
+    ):
+        self.age = age
+        self.min_age: float = 0.0
+        if age:
+            try:
+                self.min_age = Duration.parse_to_timedelta(age).total_seconds()
+            except ValueError:
+                pass
+
+        self.avatar = bool(avatar)
+        self.similar = int(similar or 0)
+        self.duplicates = int(duplicates or 0)
+        self.dry_run = bool(dry_run)
+
+        try:
+            self.action = Punishment(action) if action else Punishment.KICK
+        except ValueError:
+            self.action = Punishment.KICK
+
+    def check(
+        self, member: discord.Member, account_age: float
+    ) -> Optional[tuple[str, str]]:
+        """
+        Return the rule *member* fails and its reason, or None if they pass.
+        """
+        if self.min_age and account_age < self.min_age:
+            return "age", f"join gate: Account must be older than {self.age}"
+
+        if self.avatar and member.avatar is None:
+            return "avatar", "join gate: Default avatar not allowed"
+
+        return None
+
+
+class GateConfig:
+    """
+    Stored join gate settings for a guild.
+
+    Every write to join_gate goes through ``save``, from the cog and the API
+    alike, so values are validated once and both sides store them the same
+    way. ``compile`` turns the settings into the GateRules kept in memory.
+    """
+
+    FIELDS = ("age", "avatar", "action", "similar", "duplicates", "dry_run")
+    LIMIT = 256
+
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        age: Optional[str] = None,
+        avatar: Optional[bool] = False,
+        action: Optional[Punishment] = None,
+        similar: Optional[int] = 0,
+        duplicates: Optional[int] = 0,
+        dry_run: Optional[bool] = False,
+    ):
+        if age:
+            try:
+                Duration.parse_to_timedelta(age)
+            except ValueError:
+                raise ValueError(f"invalid age requirement: {age}")
+
+        if action is not None and not isinstance(action, Punishment):
+            try:
+                action = Punishment(action)
+            except ValueError:
+                raise ValueError(f"invalid action: {action}")
+
+        if action not in (None, Punishment.BAN, Punishment.KICK, Punishment.TIMEOUT):
+            raise ValueError(f"join gate can only ban, kick or timeout, not {action.value}")
+
+        for name, value in (("similar", similar), ("duplicates", duplicates)):
+            if value and not 0 < int(value) <= self.LIMIT:
+                raise ValueError(f"{name} must be between 1 and {self.LIMIT}")
+
+        self.age = age or None
+        self.avatar = bool(avatar)
+        self.action = action or Punishment.KICK
+        self.similar = int(similar or 0)
+        self.duplicates = int(duplicates or 0)
+        self.dry_run = bool(dry_run)
+
+    @classmethod
+    def from_row(cls, row) -> "GateConfig":
+        self = cls.__new__(cls)
+        self.age, avatar, action, similar, duplicates, dry_run = row
+        self.avatar = bool(avatar)
+        try:
+            self.action = Punishment(action) if action else Punishment.KICK
+        except ValueError:
+            self.action = Punishment.KICK
+        self.similar = int(similar or 0)
+        self.duplicates = int(duplicates or 0)
+        self.dry_run = bool(dry_run)
+        return self
+
+    @classmethod
+    async def fetch(cls, db: Database, guild_id: int) -> Optional["GateConfig"]:
+        row = await db.fetchone(
+            """
+            SELECT age, avatar, action, similar, duplicates, dry_run
+            FROM join_gate
+            WHERE guild_id = ?
+            """,
+            (guild_id,),
+        )
+        return cls.from_row(tuple(row)) if row else None
+
+    def merge(self, **changes) -> "GateConfig":
+        """
+        Return a copy with every change that is not None applied.
+        """
+        values = {name: getattr(self, name) for name in self.FIELDS}
+        values.update(
+            (name, value) for name, value in changes.items() if value is not None
+        )
+        return GateConfig(**values)
+
+    async def save(self, db: Database, guild_id: int) -> None:
+        await db.execute(
+            """
+            INSERT INTO join_gate (guild_id, age, avatar, action, similar, duplicates, dry_run)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (guild_id)
+            DO UPDATE SET
+                age = excluded.age,
+                avatar = excluded.avatar,
+                action = excluded.action,
+                similar = excluded.similar,
+                duplicates = excluded.duplicates,
+                dry_run = excluded.dry_run
+            """,
+            (
+                guild_id,
+                self.age,
+                int(self.avatar),
+                self.action.value,
+                self.similar,
+                self.duplicates,
+                int(self.dry_run),
+            ),
+        )
+
+    @staticmethod
+    async def delete(db: Database, guild_id: int) -> None:
+        await db.execute(
+            """
+            DELETE FROM join_gate
+            WHERE guild_id = ?
+            """,
+            (guild_id,),
+        )
+
+    def compile(self) -> GateRules:
+        return GateRules(
+            self.age,
+            self.avatar,
+            self.action.value,
+            self.similar,
+            self.duplicates,
+            self.dry_run,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "age": self.age,
+            "avatar": self.avatar,
+            "action": self.action.value,
+            "similar": self.similar,
+            "duplicates": self.duplicates,
+            "dry_run": self.dry_run,
+        }
@@ -0,0 +1,123 @@
+from array import array
+from operator import eq
+from random import Random
+from string import digits
+
+import zlib
+
+
+HASHES = 16
+BANDS = 4
+ROWS = HASHES // BANDS
+THRESHOLD = 0.6
+
+_PRIME = (1 << 31) - 1
+_RANDOM = Random(0x6A67)
+_SEEDS = tuple(
+    (_RANDOM.randrange(1, _PRIME), _RANDOM.randrange(0, _PRIME)) for _ in range(HASHES)
+)
+_DIGITS = str.maketrans(digits, "#" * len(digits))
+
+
+def shingles(name: str, size: int = 3) -> set[str]:
+    """
+    Character n-grams of a username, with digits folded to ``#`` so
+    ``user1234`` and ``user1235`` share every gram.
+    """
+    text = "^" + name.lower().translate(_DIGITS) + "$"
+    if len(text) <= size:
+        return {text}
+    return {text[index:index + size] for index in range(len(text) - size + 1)}
+
+
+def signature(name: str) -> array:
+    """
+    MinHash signature of a username's shingles.
+    """
+    hashes = [zlib.crc32(gram.encode()) for gram in shingles(name)]
+    return array(
+        "I", (min((a * value + b) % _PRIME for value in hashes) for a, b in _SEEDS)
+    )
+
+
+def similarity(left: array, right: array) -> float:
+    """
+    Estimated Jaccard similarity of two signatures.
+    """
+    return sum(map(eq, left, right)) / HASHES
+
+
+class NameIndex:
+    """
+    Rolling MinHash index of recent joiner usernames for one guild.
+
+    Signatures live in a fixed ring and are bucketed by LSH bands, so a new
+    name is only compared against joiners that share at least one band.
+    Scoring a join touches a handful of candidates and takes well under a
+    millisecond regardless of how many names are indexed.
+    """
+
+    SIZE = 256
+
+    __slots__ = ("signatures", "times", "keys", "buckets", "head")
+
+    def __init__(self):
+        self.signatures: list = [None] * self.SIZE
+        self.times = array("d", bytes(8 * self.SIZE))
+        self.keys = array("q", bytes(8 * self.SIZE * BANDS))
+        self.buckets: dict[int, set[int]] = {}
+        self.head = -1
+
+    @staticmethod
+    def _bands(sig: array) -> list[int]:
+        return [
+            hash((band, *sig[band * ROWS:(band + 1) * ROWS])) for band in range(BANDS)
+        ]
+
+    def add(
+        self,
+        name: str,
+        now: float,
+        window: float = 600.0,
+        limit: int = SIZE,
+    ) -> int:
+        """
+        Index *name* and return how many joiners from the last *window*
+        seconds have a similar username, counting no further than *limit*.
+        """
+        sig = signature(name)
+        bands = self._bands(sig)
+
+        since = now - window
+        candidates: set[int] = set()
+        for key in bands:
+            candidates.update(self.buckets.get(key, ()))
+
+        similar = 0
+        for slot in candidates:
+            if (
+                self.times[slot] >= since
+                and similarity(sig, self.signatures[slot]) >= THRESHOLD
+            ):
+                similar += 1
+                if similar >= limit:
+                    break
+
+        self.head = (self.head + 1) % self.SIZE
+        slot = self.head
+        if self.signatures[slot] is not None:
+            for offset in range(BANDS):
+                key = self.keys[slot * BANDS + offset]
+                bucket = self.buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(slot)
+                    if not bucket:
+                        del self.buckets[key]
+
+        self.signatures[slot] = sig
+        self.times[slot] = now
+        for offset, key in enumerate(bands):
+            self.keys[slot * BANDS + offset] = key
+            self.buckets.setdefault(key, set()).add(slot)
+
+        return similar
@@ -0,0 +1,168 @@
+from typing import Union
+
+from array import array
+from collections import defaultdict
+from datetime import timedelta
+from time import monotonic
+
+
+class InfractionTracker:
+    """
+    Rolling-window infraction tracker using monotonic time.
+
+    Each (guild_id, module) key maps to a list of monotonic timestamps.
+    Entries older than the configured window are pruned on every read.
+    """
+
+    __slots__ = ("_window", "_store")
+
+    def __init__(self, window: timedelta = timedelta(minutes=10)):
+        self._window: float = window.total_seconds()
+        self._store: dict[tuple[int, str], list[float]] = defaultdict(list)
+
+    def _prune(self, key: tuple[int, str]) -> list[float]:
+        cutoff = monotonic() - self._window
+        entries = self._store[key]
+        entries[:] = [ts for ts in entries if ts > cutoff]
+        return entries
+
+    def record(self, guild_id: int, module: str) -> int:
+        """
+        Record an infraction and return the current count
+        within the rolling window.
+        """
+        key = (guild_id, module)
+        entries = self._prune(key)
+        entries.append(monotonic())
+        return len(entries)
+
+    def reset(self, guild_id: int, module: str) -> None:
+        """
+        Clear all infractions for a key after a punishment fires.
+        """
+        self._store.pop((guild_id, module), None)
+
+    def purge_stale(self) -> int:
+        """
+        Remove all keys whose entries have fully expired.
+        Returns the number of keys removed.
+        """
+        stale = [key for key in list(self._store) if not self._prune(key)]
+        for key in stale:
+            del self._store[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._store.clear()
+
+
+class _Buckets:
+    __slots__ = ("counts", "head", "total")
+
+    def __init__(self, size: int, head: int):
+        self.counts = array("I", bytes(4 * size))
+        self.head = head
+        self.total = 0
+
+
+class BucketedInfractionTracker:
+    """
+    Fixed-memory rolling-window infraction tracker.
+
+    Each (guild_id, module) key maps to a ring of per-bucket counts held in
+    an ``array('I')`` plus a running total. Recording advances the ring to
+    the current bucket, expiring skipped buckets from the total, so memory
+    per key is constant and record is O(1) regardless of event volume.
+    Counts are accurate to one bucket width.
+    """
+
+    __slots__ = ("_width", "_size", "_store")
+
+    def __init__(self, window: timedelta = timedelta(minutes=10), buckets: int = 60):
+        self._width: float = window.total_seconds() / buckets
+        self._size: int = buckets
+        self._store: dict[tuple[int, str], _Buckets] = {}
+
+    def _now(self) -> int:
+        return int(monotonic() // self._width)
+
+    def _advance(self, entry: _Buckets, now: int) -> None:
+        gap = now - entry.head
+        if gap <= 0:
+            return
+
+        counts = entry.counts
+        if gap >= self._size:
+            for slot in range(self._size):
+                counts[slot] = 0
+            entry.total = 0
+        else:
+            for index in range(entry.head + 1, now + 1):
+                slot = index % self._size
+                entry.total -= counts[slot]
+                counts[slot] = 0
+
+        entry.head = now
+
+    def record(self, guild_id: int, module: str) -> int:
+        """
+        Record an infraction and return the current count
+        within the rolling window.
+        """
+        key = (guild_id, module)
+        now = self._now()
+
+        entry = self._store.get(key)
+        if entry is None:
+            entry = self._store[key] = _Buckets(self._size, now)
+        else:
+            self._advance(entry, now)
+
+        entry.counts[now % self._size] += 1
+        entry.total += 1
+        return entry.total
+
+    def reset(self, guild_id: int, module: str) -> None:
+        """
+        Clear all infractions for a key after a punishment fires.
+        """
+        self._store.pop((guild_id, module), None)
+
+    def purge_stale(self) -> int:
+        """
+        Remove all keys whose buckets have fully expired.
+        Returns the number of keys removed.
+        """
+        now = self._now()
+        stale = []
+        for key, entry in self._store.items():
+            self._advance(entry, now)
+            if not entry.total:
+                stale.append(key)
+
+        for key in stale:
+            del self._store[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._store.clear()
+
+
+Tracker = Union[InfractionTracker, BucketedInfractionTracker]
+
+TRACKERS = {
+    "exact": InfractionTracker,
+    "bucketed": BucketedInfractionTracker,
+}
+
+
+def create_tracker(kind: str, window: timedelta = timedelta(minutes=10)) -> Tracker:
+    """
+    Build the tracker selected by ``config.Settings.antinuke_tracker``.
+    """
+    try:
+        return TRACKERS[kind](window=window)
+    except KeyError:
+        raise ValueError(
+            f"Unknown tracker {kind!r}, expected one of: {', '.join(TRACKERS)}"
+        )
@@ -0,0 +1,151 @@
+from typing import Any, List, Optional
+
+from time import time
+
+import asyncio
+import logging
+
+from helpers.database import Database
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 10
+
+
+class CaseLog:
+    """
+    Buffered writer and reader for the cases table.
+
+    Moderation actions are appended in memory and written with one
+    ``executemany`` every ``interval`` seconds, so a mass ban of hundreds of
+    users is a single transaction. Reads flush first, and page through a
+    guild's cases with keyset pagination on the case ID, so every page is an
+    index range scan however many cases the guild has.
+    """
+
+    def __init__(self, db: Database, interval: float = 5.0):
+        self.db = db
+        self.interval = interval
+        self.pending: List[tuple] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        guild_id: int,
+        target_id: int,
+        moderator_id: int,
+        action: str,
+        reason: Optional[str] = None,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        self.pending.append(
+            (
+                guild_id,
+                target_id,
+                moderator_id,
+                action,
+                reason,
+                int(time()),
+                int(expires_at) if expires_at else None,
+            )
+        )
+
+    async def flush(self) -> None:
+        if not self.pending:
+            return
+
+        rows, self.pending = self.pending, []
+        try:
+            await self.db.executemany(
+                """
+                INSERT INTO cases (
+                    guild_id,
+                    target_id,
+                    moderator_id,
+                    action,
+                    reason,
+                    created_at,
+                    expires_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+        except Exception:
+            # keep the rows for the next flush rather than losing cases
+            self.pending[:0] = rows
+            raise
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="cases")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to write moderation cases")
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+        await self.flush()
+
+    async def history(
+        self,
+        guild_id: int,
+        target_id: int,
+        before: Optional[int] = None,
+        after: Optional[int] = None,
+        limit: int = PAGE_SIZE,
+    ) -> List[Any]:
+        """
+        Cases against *target_id*, newest first, strictly older than
+        *before* or newer than *after*.
+        """
+        await self.flush()
+
+        if after is not None:
+            rows = await self.db.fetchall(
+                """
+                SELECT id, moderator_id, action, reason, created_at, expires_at
+                FROM cases
+                WHERE guild_id = ?
+                AND target_id = ?
+                AND id > ?
+                ORDER BY id ASC
+                LIMIT ?
+                """,
+                (guild_id, target_id, after, limit),
+            )
+            return rows[::-1]
+
+        return await self.db.fetchall(
+            """
+            SELECT id, moderator_id, action, reason, created_at, expires_at
+            FROM cases
+            WHERE guild_id = ?
+            AND target_id = ?
+            AND id < ?
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (guild_id, target_id, before if before is not None else 1 << 62, limit),
+        )
+
+    async def get(self, guild_id: int, case_id: int) -> Optional[Any]:
+        await self.flush()
+
+        return await self.db.fetchone(
+            """
+            SELECT id, target_id, moderator_id, action, reason, created_at, expires_at
+            FROM cases
+            WHERE guild_id = ?
+            AND id = ?
+            """,
+            (guild_id, case_id),
+        )
\ No newline at end of file
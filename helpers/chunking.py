@@ -0,0 +1,162 @@
+from typing import Dict, Iterable, List, Set
+
+from discord.ext import commands
+from itertools import count
+from time import monotonic
+
+import asyncio
+import heapq
+import logging
+
+import discord
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+
+class ChunkScheduler:
+    """
+    On-demand member chunking.
+
+    Guilds are not chunked at startup. A guild is queued the first time
+    something needs its member list, and a fixed number of workers chunk
+    queued guilds in priority order, so a command waiting on a reply goes
+    ahead of background work such as enabling antinuke. Guilds whose member
+    list nobody has used for ``idle`` seconds have their member cache
+    dropped and are chunked again on next use, unless a feature has pinned
+    them because it relies on the cache.
+    """
+
+    def __init__(self, bot: commands.Bot, concurrency: int = 2, idle: float = 3600.0):
+        self.bot = bot
+        self.concurrency = concurrency
+        self.idle = idle
+        self.queue: List[tuple[int, int, int]] = []
+        self.waiters: Dict[int, asyncio.Future] = {}
+        self.active: Set[int] = set()
+        self.used: Dict[int, float] = {}
+        self.pins: Dict[str, Set[int]] = {}
+        self.wakeup = asyncio.Event()
+        self._order = count()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"chunker:{index}")
+            for index in range(self.concurrency)
+        ]
+        if self.idle:
+            self._tasks.append(asyncio.create_task(self._evict_loop(), name="chunker:evict"))
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+        self._tasks.clear()
+
+    def pin(self, owner: str, guild_ids: Iterable[int]) -> None:
+        """
+        Replace the set of guilds *owner* needs kept in cache.
+        """
+        self.pins[owner] = set(guild_ids)
+
+    def pinned(self, guild_id: int) -> bool:
+        return any(guild_id in guilds for guilds in self.pins.values())
+
+    async def request(
+        self,
+        guild: discord.Guild,
+        priority: int = INTERACTIVE,
+        wait: bool = True,
+    ) -> None:
+        """
+        Make sure *guild*'s members are cached, waiting for the chunk
+        unless *wait* is False.
+        """
+        self.used[guild.id] = monotonic()
+        if guild.chunked:
+            return
+
+        future = self.waiters.get(guild.id)
+        if future is None:
+            future = self.waiters[guild.id] = asyncio.get_running_loop().create_future()
+
+        heapq.heappush(self.queue, (priority, next(self._order), guild.id))
+        self.wakeup.set()
+
+        if wait:
+            await asyncio.shield(future)
+
+    async def _worker(self) -> None:
+        await self.bot.wait_until_ready()
+
+        while True:
+            if not self.queue:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+
+            _, _, guild_id = heapq.heappop(self.queue)
+            future = self.waiters.get(guild_id)
+            # a guild is queued again when a higher priority request comes in
+            if future is None or guild_id in self.active:
+                continue
+
+            self.active.add(guild_id)
+            guild = self.bot.get_guild(guild_id)
+            try:
+                if guild and not guild.chunked:
+                    await guild.chunk(cache=True)
+
+            except Exception:
+                logger.exception(f"Failed to chunk {guild_id}")
+
+            finally:
+                self.active.discard(guild_id)
+                self.waiters.pop(guild_id, None)
+                if not future.done():
+                    future.set_result(None)
+
+    async def _evict_loop(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.idle, 600))
+
+            now = monotonic()
+            for guild_id, used in list(self.used.items()):
+                if now - used < self.idle or guild_id in self.waiters or self.pinned(guild_id):
+                    continue
+
+                del self.used[guild_id]
+                guild = self.bot.get_guild(guild_id)
+                if guild is not None:
+                    self.evict(guild)
+
+    def evict(self, guild: discord.Guild) -> None:
+        """
+        Drop the member cache of *guild*, keeping the bot, the owner and
+        anyone in voice. discord.py has no public API for this.
+        """
+        keep = {self.bot.user.id, guild.owner_id, *guild._voice_states}
+        evicted = len(guild._members)
+        guild._members = {
+            member_id: member
+            for member_id, member in guild._members.items()
+            if member_id in keep
+        }
+        logger.debug(f"Evicted {evicted - len(guild._members)} members from {guild.id}")
+
+
+def requires_members(priority: int = INTERACTIVE):
+    """
+    Check that chunks the guild before the command runs.
+    """
+
+    async def predicate(context: commands.Context) -> bool:
+        if context.guild:
+            await context.bot.chunker.request(context.guild, priority)
+        return True
+
+    return commands.check(predicate)
\ No newline at end of file
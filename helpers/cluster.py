@@ -0,0 +1,394 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from itertools import count
+from multiprocessing.connection import Connection, wait
+from time import monotonic
+
+import asyncio
+import logging
+import multiprocessing
+import signal
+import threading
+
+import aiohttp
+
+from discord.ext import commands
+
+from helpers.identify import IDENTIFY_INTERVAL, IdentifyBuckets
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+GATEWAY_BOT = "https://discord.com/api/v10/gateway/bot"
+MAX_BACKOFF = 60.0
+STABLE_AFTER = 60.0
+
+Handler = Callable[[], Awaitable[Any]]
+
+
+def shard_ranges(shard_count: int, clusters: int) -> List[List[int]]:
+    """
+    Split *shard_count* shards into at most *clusters* contiguous ranges
+    whose sizes differ by no more than one.
+    """
+    clusters = max(1, min(clusters, shard_count))
+    size, extra = divmod(shard_count, clusters)
+
+    ranges, start = [], 0
+    for index in range(clusters):
+        end = start + size + (index < extra)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+async def gateway_info(token: str) -> Dict[str, Any]:
+    """
+    Recommended shard count and session start limits for *token*.
+    """
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            GATEWAY_BOT, headers={"Authorization": f"Bot {token}"}
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
+
+async def bot_stats(bot: commands.AutoShardedBot) -> Dict[str, Any]:
+    scheduler = getattr(bot, "scheduler", None)
+    return {
+        "shards": sorted(bot.shards),
+        "guilds": len(bot.guilds),
+        "users": sum(guild.member_count or 0 for guild in bot.guilds),
+        "latency": bot.latency,
+        "jobs": scheduler.stats() if scheduler else None,
+    }
+
+
+class ClusterClient:
+    """
+    A cluster's end of the pipe to the launcher.
+
+    ``gather`` asks the launcher to run a named handler on every cluster
+    and returns their results, so a command can report totals for the
+    whole bot. Pipe reads happen on a daemon thread that hands messages
+    back to the event loop, so a dead launcher never blocks shutdown.
+    """
+
+    def __init__(
+        self,
+        bot: commands.AutoShardedBot,
+        cluster_id: int,
+        conn: Connection,
+        timeout: float = 5.0,
+    ):
+        self.bot = bot
+        self.cluster_id = cluster_id
+        self.conn = conn
+        self.timeout = timeout
+        self.handlers: Dict[str, Handler] = {"stats": lambda: bot_stats(bot)}
+        self.pending: Dict[int, asyncio.Future] = {}
+        self._ids = count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def register(self, name: str, handler: Handler) -> None:
+        self.handlers[name] = handler
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        try:
+            # the launcher stops clusters with SIGTERM, close cleanly so buffers flush
+            self._loop.add_signal_handler(
+                signal.SIGTERM, lambda: asyncio.create_task(self.bot.close())
+            )
+        except NotImplementedError:
+            pass
+
+        threading.Thread(
+            target=self._read, name=f"cluster:{self.cluster_id}", daemon=True
+        ).start()
+
+    def _read(self) -> None:
+        while True:
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                self._loop.call_soon_threadsafe(self._disconnected)
+                return
+
+            self._loop.call_soon_threadsafe(self._dispatch, message)
+
+    def _disconnected(self) -> None:
+        logger.warning(f"Cluster {self.cluster_id} lost its launcher, shutting down")
+        asyncio.create_task(self.bot.close())
+
+    def _dispatch(self, message: tuple) -> None:
+        kind, query_id, value = message
+        if kind == "call":
+            asyncio.create_task(self._call(query_id, value))
+
+        elif kind == "reply":
+            future = self.pending.pop(query_id, None)
+            if future is not None and not future.done():
+                future.set_result(value)
+
+    async def _call(self, query_id: int, name: str) -> None:
+        value = None
+        handler = self.handlers.get(name)
+        try:
+            if handler is not None:
+                value = await handler()
+        except Exception:
+            logger.exception(f"IPC handler {name} failed")
+
+        self._send(("result", query_id, value))
+
+    def _send(self, message: tuple) -> None:
+        try:
+            self.conn.send(message)
+        except (BrokenPipeError, OSError):
+            logger.warning(f"Cluster {self.cluster_id} could not reach its launcher")
+
+    async def gather(self, name: str, timeout: Optional[float] = None) -> List[Any]:
+        """
+        Run handler *name* on every cluster and return the results in
+        cluster order. Clusters that are down or don't answer within
+        *timeout* seconds are left out.
+        """
+        timeout = timeout or self.timeout
+        # the launcher answers with partial results at the deadline
+        return await self._request("gather", (name, timeout), timeout + 1, [])
+
+    async def reserve_identify(self, shard_id: Optional[int]) -> float:
+        """
+        Book an identify slot with the launcher, which paces every cluster's
+        shards through the same buckets, and return how long to wait for it.
+        """
+        return await self._request("identify", shard_id, self.timeout, IDENTIFY_INTERVAL)
+
+    async def _request(self, kind: str, value: Any, timeout: float, default: Any) -> Any:
+        query_id = next(self._ids)
+        future = self.pending[query_id] = asyncio.get_running_loop().create_future()
+        self._send((kind, query_id, value))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return default
+        finally:
+            self.pending.pop(query_id, None)
+
+
+def _run_cluster(
+    factory: Callable[..., commands.AutoShardedBot],
+    cluster_id: int,
+    shard_ids: List[int],
+    shard_count: int,
+    token: str,
+    conn: Connection,
+) -> None:
+    # the launcher handles shutdown and terminates clusters itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    bot = factory(shard_ids=shard_ids, shard_count=shard_count)
+    bot.ipc = ClusterClient(bot, cluster_id, conn)
+    bot.run(token=token)
+
+
+class _Cluster:
+    __slots__ = ("id", "shard_ids", "process", "conn", "started", "failures", "restart_at")
+
+    def __init__(self, cluster_id: int, shard_ids: List[int]):
+        self.id = cluster_id
+        self.shard_ids = shard_ids
+        self.process: Optional[multiprocessing.Process] = None
+        self.conn: Optional[Connection] = None
+        self.started = 0.0
+        self.failures = 0
+        self.restart_at: Optional[float] = None
+
+
+class _Query:
+    __slots__ = ("cluster_id", "query_id", "waiting", "results", "deadline")
+
+    def __init__(self, cluster_id: int, query_id: int, waiting: Set[int], deadline: float):
+        self.cluster_id = cluster_id
+        self.query_id = query_id
+        self.waiting = waiting
+        self.results: Dict[int, Any] = {}
+        self.deadline = deadline
+
+
+class Launcher:
+    """
+    Runs the bot as several processes, each owning a contiguous range of
+    shards, so a large bot can use every core of the host.
+
+    Clusters that exit are restarted with exponential backoff, reset once
+    a cluster has stayed up for a minute. The launcher also relays
+    ``gather`` queries between clusters over one pipe per process, and
+    hands out identify slots so clusters share the gateway's session start
+    buckets instead of each pacing on its own.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[..., commands.AutoShardedBot],
+        token: str,
+        clusters: int,
+        shard_count: Optional[int] = None,
+    ):
+        self.factory = factory
+        self.token = token
+        self.clusters = clusters
+        self.shard_count = shard_count
+        self.context = multiprocessing.get_context("spawn")
+        self.members: Dict[int, _Cluster] = {}
+        self.queries: Dict[int, _Query] = {}
+        self.identify = IdentifyBuckets()
+        self.stopping = False
+        self._ids = count()
+
+    def run(self) -> None:
+        info = asyncio.run(gateway_info(self.token))
+        self.shard_count = self.shard_count or info["shards"]
+        self.identify.max_concurrency = max(1, info["session_start_limit"]["max_concurrency"])
+
+        for cluster_id, shard_ids in enumerate(shard_ranges(self.shard_count, self.clusters)):
+            self.members[cluster_id] = _Cluster(cluster_id, shard_ids)
+            self.spawn(self.members[cluster_id])
+
+        logger.info(f"Launched {len(self.members)} clusters for {self.shard_count} shards")
+
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        try:
+            while not self.stopping:
+                self.poll()
+        finally:
+            self.shutdown()
+
+    def stop(self, *_) -> None:
+        self.stopping = True
+
+    def spawn(self, cluster: _Cluster) -> None:
+        conn, child = self.context.Pipe()
+        cluster.process = self.context.Process(
+            target=_run_cluster,
+            args=(self.factory, cluster.id, cluster.shard_ids, self.shard_count, self.token, child),
+            name=f"cluster-{cluster.id}",
+        )
+        cluster.process.start()
+        child.close()
+
+        cluster.conn = conn
+        cluster.started = monotonic()
+        cluster.restart_at = None
+        logger.info(
+            f"Started cluster {cluster.id} with shards "
+            f"{cluster.shard_ids[0]}-{cluster.shard_ids[-1]}"
+        )
+
+    def poll(self, timeout: float = 1.0) -> None:
+        connections = {
+            cluster.conn: cluster for cluster in self.members.values() if cluster.conn
+        }
+        for conn in wait(list(connections), timeout=timeout):
+            cluster = connections[conn]
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                self.disconnect(cluster)
+                continue
+
+            self.handle(cluster, message)
+
+        now = monotonic()
+        for query_id, query in list(self.queries.items()):
+            if query.deadline <= now:
+                self.answer(query_id)
+
+        for cluster in self.members.values():
+            self.supervise(cluster, now)
+
+    def handle(self, cluster: _Cluster, message: tuple) -> None:
+        kind, query_id, value = message
+        if kind == "identify":
+            self.send(cluster, ("reply", query_id, self.identify.reserve(value)))
+
+        elif kind == "gather":
+            name, timeout = value
+            targets = [member for member in self.members.values() if member.conn]
+
+            relay_id = next(self._ids)
+            self.queries[relay_id] = _Query(
+                cluster.id, query_id, {member.id for member in targets}, monotonic() + timeout
+            )
+            for member in targets:
+                self.send(member, ("call", relay_id, name))
+
+        elif kind == "result":
+            query = self.queries.get(query_id)
+            if query is None:
+                return
+
+            query.results[cluster.id] = value
+            query.waiting.discard(cluster.id)
+            if not query.waiting:
+                self.answer(query_id)
+
+    def answer(self, relay_id: int) -> None:
+        query = self.queries.pop(relay_id)
+        requester = self.members.get(query.cluster_id)
+        if requester and requester.conn:
+            self.send(
+                requester,
+                ("reply", query.query_id, [query.results[key] for key in sorted(query.results)]),
+            )
+
+    def send(self, cluster: _Cluster, message: tuple) -> None:
+        try:
+            cluster.conn.send(message)
+        except (BrokenPipeError, OSError):
+            self.disconnect(cluster)
+
+    def disconnect(self, cluster: _Cluster) -> None:
+        if cluster.conn is None:
+            return
+
+        cluster.conn.close()
+        cluster.conn = None
+        for relay_id, query in list(self.queries.items()):
+            query.waiting.discard(cluster.id)
+            if not query.waiting and relay_id in self.queries:
+                self.answer(relay_id)
+
+    def supervise(self, cluster: _Cluster, now: float) -> None:
+        if cluster.process.is_alive() or self.stopping:
+            return
+
+        if cluster.restart_at is None:
+            self.disconnect(cluster)
+            cluster.failures = 1 if now - cluster.started >= STABLE_AFTER else cluster.failures + 1
+            delay = min(2 ** (cluster.failures - 1), MAX_BACKOFF)
+            cluster.restart_at = now + delay
+            logger.warning(
+                f"Cluster {cluster.id} exited with code {cluster.process.exitcode}, "
+                f"restarting in {delay:.0f}s"
+            )
+
+        elif now >= cluster.restart_at:
+            self.spawn(cluster)
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        logger.info("Stopping clusters")
+        for cluster in self.members.values():
+            if cluster.process.is_alive():
+                cluster.process.terminate()
+
+        deadline = monotonic() + timeout
+        for cluster in self.members.values():
+            cluster.process.join(max(0.0, deadline - monotonic()))
+            if cluster.process.is_alive():
+                cluster.process.kill()
+            if cluster.conn:
+                cluster.conn.close()
\ No newline at end of file
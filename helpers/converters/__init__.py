@@ -1,4 +1,5 @@
 from .member import *
 from .role import *
 from .duration import *
+from .selector import *
 from .antinuke.modules import * 
\ No newline at end of file
@@ -0,0 +1,54 @@
+from typing import Optional
+
+from discord.ext import commands
+
+import discord
+
+
+class Selector(commands.Converter):
+    """Converter for member groups: all, humans, bots or has:<role>"""
+
+    KINDS = ("all", "humans", "bots", "has")
+
+    def __init__(self, kind: str = "all", role_id: Optional[int] = None):
+        self.kind = kind
+        self.role_id = role_id
+
+    @classmethod
+    async def convert(cls, context: commands.Context, argument: str) -> "Selector":
+        kind, _, role = argument.lower().partition(":")
+        if kind not in cls.KINDS or bool(role) != (kind == "has"):
+            raise commands.BadArgument(
+                "Selector must be all, humans, bots or has:<role>"
+            )
+
+        if kind == "has":
+            target = await commands.RoleConverter().convert(
+                context, argument.partition(":")[2]
+            )
+            return cls(kind, target.id)
+
+        return cls(kind)
+
+    @classmethod
+    def parse(cls, value: str) -> "Selector":
+        """Rebuild a selector from its string form"""
+        kind, _, role = value.partition(":")
+        return cls(kind, int(role) if role else None)
+
+    def matches(self, member: discord.Member) -> bool:
+        if self.kind == "humans":
+            return not member.bot
+        if self.kind == "bots":
+            return member.bot
+        if self.kind == "has":
+            return member.get_role(self.role_id) is not None
+        return True
+
+    def describe(self) -> str:
+        if self.kind == "has":
+            return f"members with <@&{self.role_id}>"
+        return "members" if self.kind == "all" else self.kind
+
+    def __str__(self) -> str:
+        return f"has:{self.role_id}" if self.kind == "has" else self.kind
\ No newline at end of file
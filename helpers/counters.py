@@ -0,0 +1,124 @@
+from typing import Dict, Optional
+
+import logging
+
+import discord
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def _online(member: discord.Member) -> bool:
+    return member.status is not discord.Status.offline
+
+
+class GuildCounts:
+    """
+    Member totals for a single guild.
+    """
+
+    __slots__ = ("humans", "bots", "boosters", "online")
+
+    def __init__(self, humans: int = 0, bots: int = 0, boosters: int = 0, online: int = 0):
+        self.humans = humans
+        self.bots = bots
+        self.boosters = boosters
+        self.online = online
+
+    @classmethod
+    def count(cls, guild: discord.Guild) -> "GuildCounts":
+        counts = cls()
+        for member in guild.members:
+            counts.add(member, 1)
+        return counts
+
+    def add(self, member: discord.Member, sign: int) -> None:
+        if member.bot:
+            self.bots += sign
+        else:
+            self.humans += sign
+        if member.premium_since is not None:
+            self.boosters += sign
+        if _online(member):
+            self.online += sign
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, GuildCounts) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def to_dict(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class GuildCounters:
+    """
+    Incrementally maintained member counts per guild.
+
+    Counts are built once from the member cache when a chunked guild is
+    first asked for and then kept current from member and presence events,
+    so reading them is O(1). Guilds whose member cache was evicted are
+    dropped because boost and presence updates for uncached members never
+    reach the bot, and ``reconcile`` recounts the rest to correct any drift
+    from missed events.
+    """
+
+    def __init__(self):
+        self.counts: Dict[int, GuildCounts] = {}
+
+    def get(self, guild: discord.Guild) -> Optional[GuildCounts]:
+        """
+        Counts for *guild*, or None if its members aren't cached.
+        """
+        if not guild.chunked:
+            self.counts.pop(guild.id, None)
+            return None
+
+        counts = self.counts.get(guild.id)
+        if counts is None:
+            counts = self.counts[guild.id] = GuildCounts.count(guild)
+        return counts
+
+    def member_join(self, member: discord.Member) -> None:
+        counts = self.counts.get(member.guild.id)
+        if counts is not None:
+            counts.add(member, 1)
+
+    def member_remove(self, member: discord.Member) -> None:
+        counts = self.counts.get(member.guild.id)
+        if counts is not None:
+            counts.add(member, -1)
+
+    def member_update(self, before: discord.Member, after: discord.Member) -> None:
+        counts = self.counts.get(after.guild.id)
+        if counts is None:
+            return
+
+        boosting = after.premium_since is not None
+        if (before.premium_since is not None) != boosting:
+            counts.boosters += 1 if boosting else -1
+
+    def presence_update(self, before: discord.Member, after: discord.Member) -> None:
+        counts = self.counts.get(after.guild.id)
+        if counts is None:
+            return
+
+        online = _online(after)
+        if _online(before) != online:
+            counts.online += 1 if online else -1
+
+    def discard(self, guild_id: int) -> None:
+        self.counts.pop(guild_id, None)
+
+    def reconcile(self, guild: discord.Guild) -> None:
+        """
+        Recount *guild* from its member cache.
+        """
+        if not guild.chunked:
+            self.counts.pop(guild.id, None)
+            return
+
+        counts = GuildCounts.count(guild)
+        if self.counts.get(guild.id) not in (None, counts):
+            logger.debug(f"Corrected member counts drift in {guild.id}")
+        self.counts[guild.id] = counts
\ No newline at end of file
@@ -0,0 +1,92 @@
+from typing import Any, Awaitable, Callable, Dict
+
+from collections import deque
+
+import asyncio
+import logging
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class Dispatcher:
+    """
+    Per-key ordered work queues.
+
+    Work submitted for the same key (usually a guild ID) runs strictly in
+    submission order, while different keys are drained concurrently. Each key
+    owns a deque and at most one worker task; the worker exits as soon as
+    its queue is empty, so idle guilds cost nothing. Everything runs on the
+    event loop, so no locks are needed.
+    """
+
+    __slots__ = ("name", "_queues", "_workers", "_processed", "_peak")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._queues: Dict[int, deque] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._processed: Dict[int, int] = {}
+        self._peak: Dict[int, int] = {}
+
+    def submit(self, key: int, func: Callable[..., Awaitable[Any]], *args: Any) -> None:
+        """
+        Queue ``func(*args)`` behind any pending work for *key*.
+        """
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+
+        queue.append((func, args))
+        if len(queue) > self._peak.get(key, 0):
+            self._peak[key] = len(queue)
+
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(
+                self._drain(key, queue), name=f"{self.name}:{key}"
+            )
+
+    async def _drain(self, key: int, queue: deque) -> None:
+        try:
+            while queue:
+                func, args = queue.popleft()
+                try:
+                    await func(*args)
+                except Exception:
+                    logger.exception(f"{self.name} worker for {key} failed")
+
+                self._processed[key] = self._processed.get(key, 0) + 1
+        finally:
+            self._workers.pop(key, None)
+            self._queues.pop(key, None)
+
+    def depth(self, key: int) -> int:
+        """
+        Number of items waiting for *key*, excluding the one in flight.
+        """
+        queue = self._queues.get(key)
+        return len(queue) if queue else 0
+
+    def stats(self, key: int) -> Dict[str, int]:
+        return {
+            "depth": self.depth(key),
+            "processed": self._processed.get(key, 0),
+            "peak": self._peak.get(key, 0),
+            "active": int(key in self._workers),
+        }
+
+    def snapshot(self) -> Dict[int, Dict[str, int]]:
+        """
+        Metrics for every key that has seen work.
+        """
+        return {key: self.stats(key) for key in self._processed.keys() | self._queues.keys()}
+
+    def close(self) -> None:
+        """
+        Cancel all workers and drop any pending work.
+        """
+        for task in self._workers.values():
+            task.cancel()
+
+        self._workers.clear()
+        self._queues.clear()
@@ -0,0 +1,248 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from collections import defaultdict, deque
+from datetime import timedelta
+from time import monotonic
+
+import asyncio
+import logging
+
+import discord
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+Target = Union[discord.Member, discord.User, discord.Object]
+
+BULK_BAN_LIMIT = 200
+MAX_TIMEOUT = timedelta(days=28)
+
+Progress = Callable[[int, int], Awaitable[None]]
+
+
+class _GuildQueue:
+    __slots__ = ("pending", "seen", "worker")
+
+    def __init__(self):
+        self.pending: deque = deque()
+        self.seen: set[tuple[str, int]] = set()
+        self.worker: Optional[asyncio.Task] = None
+
+
+class Enforcer:
+    """
+    Per-guild queue of moderation actions.
+
+    Actions are deduplicated per (action, user) while pending and drained by
+    one worker per guild. The worker waits ``delay`` seconds so a burst can
+    accumulate, then sends bans through the bulk-ban endpoint in batches of
+    up to 200, or one at a time without Manage Server, and runs kicks and
+    timeouts with at most ``concurrency`` requests in flight. Requests go
+    through discord.py's HTTP client, which waits out the per-route
+    rate-limit buckets instead of retrying blindly.
+    """
+
+    def __init__(self, name: str, concurrency: int = 4, delay: float = 1.0):
+        self.name = name
+        self.delay = delay
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._queues: Dict[int, _GuildQueue] = {}
+        self._stats: Dict[int, Dict[str, float]] = defaultdict(
+            lambda: {"done": 0, "failed": 0, "requests": 0, "busy": 0.0}
+        )
+
+    def submit(
+        self,
+        guild: discord.Guild,
+        target: Target,
+        action: str,
+        reason: Optional[str] = None,
+    ) -> bool:
+        """
+        Queue *action* ("ban", "kick" or "timeout") against *target*.
+        Returns False if the same action is already pending for them.
+        """
+        queue = self._queues.get(guild.id)
+        if queue is None:
+            queue = self._queues[guild.id] = _GuildQueue()
+
+        key = (action, target.id)
+        if key in queue.seen:
+            return False
+
+        queue.seen.add(key)
+        queue.pending.append((action, reason, target))
+
+        if queue.worker is None:
+            queue.worker = asyncio.create_task(
+                self._drain(guild, queue), name=f"{self.name}:{guild.id}"
+            )
+        return True
+
+    async def _drain(self, guild: discord.Guild, queue: _GuildQueue) -> None:
+        stats = self._stats[guild.id]
+        try:
+            while queue.pending:
+                await asyncio.sleep(self.delay)
+                started = monotonic()
+
+                bans: Dict[Optional[str], List[Target]] = defaultdict(list)
+                others = []
+                while queue.pending:
+                    action, reason, target = queue.pending.popleft()
+                    queue.seen.discard((action, target.id))
+                    if action == "ban":
+                        bans[reason].append(target)
+                    else:
+                        others.append((action, reason, target))
+
+                for reason, targets in bans.items():
+                    for index in range(0, len(targets), BULK_BAN_LIMIT):
+                        await self._ban(guild, targets[index:index + BULK_BAN_LIMIT], reason)
+
+                await asyncio.gather(
+                    *(self._apply(guild, *entry) for entry in others)
+                )
+                stats["busy"] += monotonic() - started
+        finally:
+            self._queues.pop(guild.id, None)
+
+    async def run(
+        self,
+        guild: discord.Guild,
+        targets: List[Target],
+        action: str,
+        reason: Optional[str] = None,
+        duration: Optional[timedelta] = None,
+        progress: Optional[Progress] = None,
+    ) -> Tuple[List[Target], int]:
+        """
+        Apply *action* to every target now, bypassing the queue, and return
+        the targets it succeeded on with the number that failed.
+        ``progress(done, failed)`` is awaited as results come in; bans
+        report once per bulk request.
+        """
+        done: List[Target] = []
+        failed = 0
+        started = monotonic()
+        try:
+            if action == "ban":
+                for index in range(0, len(targets), BULK_BAN_LIMIT):
+                    banned, missed = await self._ban(
+                        guild, targets[index:index + BULK_BAN_LIMIT], reason
+                    )
+                    done.extend(banned)
+                    failed += missed
+                    if progress:
+                        await progress(len(done), failed)
+
+                return done, failed
+
+            async def apply(target: Target) -> Tuple[Target, bool]:
+                return target, await self._apply(
+                    guild, action, reason, target, duration or MAX_TIMEOUT
+                )
+
+            tasks = [asyncio.create_task(apply(target)) for target in targets]
+            try:
+                for result in asyncio.as_completed(tasks):
+                    target, ok = await result
+                    if ok:
+                        done.append(target)
+                    else:
+                        failed += 1
+                    if progress:
+                        await progress(len(done), failed)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+            return done, failed
+        finally:
+            self._stats[guild.id]["busy"] += monotonic() - started
+
+    async def _ban(
+        self,
+        guild: discord.Guild,
+        targets: List[Target],
+        reason: Optional[str],
+    ) -> Tuple[List[Target], int]:
+        # the bulk ban endpoint needs Manage Server on top of Ban Members
+        if len(targets) > 1 and guild.me.guild_permissions.manage_guild:
+            stats = self._stats[guild.id]
+            stats["requests"] += 1
+            try:
+                result = await guild.bulk_ban(targets, reason=reason)
+                stats["done"] += len(result.banned)
+                stats["failed"] += len(result.failed)
+                return result.banned, len(result.failed)
+
+            except discord.Forbidden:
+                logger.debug(f"{self.name} can't bulk ban in {guild.id}, banning one by one")
+
+            except discord.HTTPException:
+                logger.warning(f"{self.name} failed to ban {len(targets)} users in {guild.id}")
+                stats["failed"] += len(targets)
+                return [], len(targets)
+
+        results = await asyncio.gather(
+            *(self._apply(guild, "ban", reason, target) for target in targets)
+        )
+        banned = [target for target, ok in zip(targets, results) if ok]
+        return banned, len(targets) - len(banned)
+
+    async def _apply(
+        self,
+        guild: discord.Guild,
+        action: str,
+        reason: Optional[str],
+        target: Target,
+        duration: timedelta = MAX_TIMEOUT,
+    ) -> bool:
+        stats = self._stats[guild.id]
+        async with self._semaphore:
+            stats["requests"] += 1
+            try:
+                if action == "timeout":
+                    member = target if isinstance(target, discord.Member) else guild.get_member(target.id)
+                    if member is None:
+                        stats["failed"] += 1
+                        return False
+                    await member.timeout(duration, reason=reason)
+                elif action == "ban":
+                    await guild.ban(target, reason=reason)
+                else:
+                    await guild.kick(target, reason=reason)
+                stats["done"] += 1
+                return True
+
+            except discord.HTTPException:
+                stats["failed"] += 1
+                return False
+
+    def depth(self, guild_id: int) -> int:
+        queue = self._queues.get(guild_id)
+        return len(queue.pending) if queue else 0
+
+    def stats(self, guild_id: int) -> Dict[str, float]:
+        """
+        Totals for *guild_id* plus ``rate``, actions per second of work.
+        """
+        stats = self._stats.get(guild_id)
+        if not stats:
+            return {"queued": self.depth(guild_id), "done": 0, "failed": 0, "requests": 0, "rate": 0.0}
+
+        return {
+            "queued": self.depth(guild_id),
+            "done": stats["done"],
+            "failed": stats["failed"],
+            "requests": stats["requests"],
+            "rate": stats["done"] / stats["busy"] if stats["busy"] else 0.0,
+        }
+
+    def close(self) -> None:
+        for queue in self._queues.values():
+            if queue.worker:
+                queue.worker.cancel()
+
+        self._queues.clear()
@@ -0,0 +1,45 @@
+from typing import Dict, Iterable, List, Optional
+
+from collections import defaultdict
+from time import monotonic
+
+
+IDENTIFY_INTERVAL = 5.0
+
+
+class IdentifyBuckets:
+    """
+    Identify rate limit buckets.
+
+    Discord lets a bot start ``max_concurrency`` sessions every five
+    seconds, one per bucket, where a shard's bucket is ``shard_id %
+    max_concurrency``. ``reserve`` books the next free slot in a shard's
+    bucket and returns how long to wait for it, so shards in different
+    buckets identify in parallel while each bucket stays within its limit.
+    """
+
+    __slots__ = ("max_concurrency", "interval", "slots")
+
+    def __init__(self, max_concurrency: int = 1, interval: float = IDENTIFY_INTERVAL):
+        self.max_concurrency = max(1, max_concurrency)
+        self.interval = interval
+        self.slots: Dict[int, float] = {}
+
+    def bucket(self, shard_id: Optional[int]) -> int:
+        return (shard_id or 0) % self.max_concurrency
+
+    def split(self, shard_ids: Iterable[int]) -> List[List[int]]:
+        """
+        Group *shard_ids* by bucket, keeping their order.
+        """
+        buckets: Dict[int, List[int]] = defaultdict(list)
+        for shard_id in shard_ids:
+            buckets[self.bucket(shard_id)].append(shard_id)
+        return list(buckets.values())
+
+    def reserve(self, shard_id: Optional[int]) -> float:
+        bucket = self.bucket(shard_id)
+        now = monotonic()
+        slot = max(now, self.slots.get(bucket, 0.0))
+        self.slots[bucket] = slot + self.interval
+        return slot - now
\ No newline at end of file
@@ -0,0 +1,71 @@
+from typing import Iterable, Optional
+
+import importlib
+import logging
+
+import discord
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# prefix commands need message content in guilds and DMs
+BASE = discord.Intents(
+    guilds=True,
+    guild_messages=True,
+    dm_messages=True,
+    message_content=True,
+)
+
+# member cache flags and the intent each one needs
+CACHE_INTENTS = {
+    "joined": "members",
+    "voice": "voice_states",
+}
+
+
+def feature_intents(features: Iterable[str]) -> discord.Intents:
+    """
+    Union of the base intents and the ``INTENTS`` each feature module
+    declares. A feature that declares nothing gets every intent, so adding
+    one without thinking about intents can't silently break it.
+    """
+    intents = discord.Intents._from_value(BASE.value)
+    for feature in features:
+        try:
+            module = importlib.import_module("features." + feature)
+        except Exception:
+            # the load itself reports the error
+            logger.warning(f"Could not read intents for {feature}")
+            continue
+
+        intents |= getattr(module, "INTENTS", discord.Intents.all())
+    return intents
+
+
+def member_cache_flags(
+    names: Optional[Iterable[str]], intents: discord.Intents
+) -> discord.MemberCacheFlags:
+    """
+    Member cache flags from their names, or derived from *intents* when
+    *names* is None. Raises ValueError for an unknown name or one whose
+    intent no enabled feature declares.
+    """
+    if names is None:
+        return discord.MemberCacheFlags.from_intents(intents)
+
+    flags = discord.MemberCacheFlags.none()
+    for name in names:
+        intent = CACHE_INTENTS.get(name)
+        if intent is None:
+            raise ValueError(
+                f"Unknown member_cache flag {name!r}, expected one of "
+                + ", ".join(repr(flag) for flag in CACHE_INTENTS)
+            )
+        if not getattr(intents, intent):
+            raise ValueError(
+                f"member_cache flag {name!r} needs the {intent} intent, "
+                "which none of the enabled features declare"
+            )
+
+        setattr(flags, name, True)
+    return flags
\ No newline at end of file
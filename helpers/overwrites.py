@@ -0,0 +1,97 @@
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
+
+import asyncio
+import logging
+
+import discord
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+Target = Union[discord.Member, discord.Role]
+Change = Tuple[discord.abc.GuildChannel, Optional[discord.PermissionOverwrite]]
+Progress = Callable[[int, int], Awaitable[None]]
+
+
+def plan_overwrites(
+    channels: List[discord.abc.GuildChannel],
+    target: Target,
+    **permissions: Optional[bool],
+) -> List[Change]:
+    """
+    Return the channels whose overwrite for *target* would actually change,
+    with the overwrite to write (None deletes it).
+
+    Editing a category over the API does not touch its synced children, so
+    a child that needs the change is edited itself and its category is
+    edited with it, which keeps the child synced.
+    """
+    changes: dict[int, Change] = {}
+    categories: dict[int, discord.CategoryChannel] = {}
+
+    for channel in channels:
+        current = channel.overwrites_for(target)
+        updated = discord.PermissionOverwrite(**dict(current))
+        updated.update(**permissions)
+        if updated.pair() == current.pair():
+            continue
+
+        changes[channel.id] = (channel, None if updated.is_empty() else updated)
+        if channel.category and channel.permissions_synced:
+            categories[channel.category.id] = channel.category
+
+    for category in categories.values():
+        if category.id in changes:
+            continue
+
+        current = category.overwrites_for(target)
+        updated = discord.PermissionOverwrite(**dict(current))
+        updated.update(**permissions)
+        if updated.pair() != current.pair():
+            changes[category.id] = (category, None if updated.is_empty() else updated)
+
+    return list(changes.values())
+
+
+async def apply_overwrites(
+    changes: List[Change],
+    target: Target,
+    reason: Optional[str] = None,
+    concurrency: int = 5,
+    progress: Optional[Progress] = None,
+) -> Tuple[int, List[discord.abc.GuildChannel]]:
+    """
+    Write a plan from ``plan_overwrites`` with at most *concurrency* edits in
+    flight, returning how many succeeded and the channels that failed.
+    Rate limits are waited out by discord.py's HTTP client.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def edit(change: Change) -> Tuple[discord.abc.GuildChannel, bool]:
+        channel, overwrite = change
+        async with semaphore:
+            try:
+                await channel.set_permissions(target, overwrite=overwrite, reason=reason)
+                return channel, True
+
+            except discord.HTTPException:
+                logger.warning(f"Failed to edit overwrites in {channel.id}")
+                return channel, False
+
+    done = 0
+    failed: List[discord.abc.GuildChannel] = []
+    tasks = [asyncio.create_task(edit(change)) for change in changes]
+    try:
+        for result in asyncio.as_completed(tasks):
+            channel, ok = await result
+            if ok:
+                done += 1
+            else:
+                failed.append(channel)
+            if progress:
+                await progress(done, len(failed))
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    return done, failed
\ No newline at end of file
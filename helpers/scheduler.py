@@ -0,0 +1,347 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from collections import defaultdict
+from datetime import datetime
+from time import monotonic, time
+
+import asyncio
+import json
+import logging
+
+from helpers.database import Database
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+MAX_ATTEMPTS = 5
+
+
+class Job:
+    __slots__ = ("id", "kind", "key", "guild_id", "payload", "run_at", "attempts")
+
+    def __init__(
+        self,
+        id: int,
+        kind: str,
+        key: str,
+        guild_id: Optional[int],
+        payload: Dict[str, Any],
+        run_at: int,
+        attempts: int = 0,
+    ):
+        self.id = id
+        self.kind = kind
+        self.key = key
+        self.guild_id = guild_id
+        self.payload = payload
+        self.run_at = run_at
+        self.attempts = attempts
+
+    @classmethod
+    def from_row(cls, row) -> "Job":
+        id, kind, key, guild_id, payload, run_at, attempts = row
+        return cls(id, kind, key, guild_id, json.loads(payload), run_at, attempts)
+
+
+class Scheduler:
+    """
+    Durable scheduler for delayed jobs.
+
+    Jobs live in the jobs table and are identified by an idempotency key, so
+    scheduling the same key twice moves the existing job instead of adding a
+    second one. Jobs due within ``horizon`` seconds are held in a timer wheel
+    of one-second slots; later ones stay on disk and are pulled in as the
+    horizon advances, so memory only covers the near future.
+
+    Execution is at-least-once: a job row is deleted only after its handler
+    returns, and anything left over after a crash is loaded and run again on
+    start. Failed jobs are retried with exponential backoff, up to
+    ``MAX_ATTEMPTS``. Handlers must therefore be idempotent.
+
+    Everything due at once, such as the backlog after downtime, runs as one
+    batch with at most ``concurrency`` jobs in flight per guild, and the
+    finished jobs are deleted in a single transaction.
+
+    When the bot runs as several clusters sharing one database, ``owns``
+    limits each scheduler to the jobs of guilds on its own shards.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        horizon: int = 3600,
+        concurrency: int = 4,
+        ready: Optional[Callable[[], Awaitable[Any]]] = None,
+        owns: Optional[Callable[[Optional[int]], bool]] = None,
+    ):
+        self.db = db
+        self.horizon = horizon
+        self.concurrency = concurrency
+        self.ready = ready
+        self.owns = owns
+        self.backlog = 0
+        self._stats: Dict[str, float] = {"done": 0, "failed": 0, "busy": 0.0}
+        self.handlers: Dict[str, Handler] = {}
+        self.wheel: List[List[Job]] = [[] for _ in range(horizon)]
+        self.pending: Dict[str, Job] = {}
+        self.cursor = 0
+        self.loaded_until = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, kind: str, handler: Handler) -> None:
+        """
+        Run *handler* with the job payload whenever a *kind* job is due.
+        """
+        self.handlers[kind] = handler
+
+    def unregister(self, kind: str) -> None:
+        self.handlers.pop(kind, None)
+
+    async def schedule(
+        self,
+        kind: str,
+        when: datetime,
+        key: str,
+        guild_id: Optional[int] = None,
+        **payload: Any,
+    ) -> None:
+        """
+        Persist a job and, if it falls inside the horizon, put it on the wheel.
+        """
+        run_at = int(when.timestamp())
+        await self.db.execute(
+            """
+            INSERT INTO jobs (kind, key, guild_id, payload, run_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET
+                kind = excluded.kind,
+                guild_id = excluded.guild_id,
+                payload = excluded.payload,
+                run_at = excluded.run_at,
+                attempts = 0
+            """,
+            (kind, key, guild_id, json.dumps(payload), run_at),
+        )
+        row = await self.db.fetchone(
+            """
+            SELECT id
+            FROM jobs
+            WHERE key = ?
+            """,
+            (key,),
+        )
+
+        if run_at < self.loaded_until:
+            self._place(Job(row[0], kind, key, guild_id, payload, run_at))
+        else:
+            # loaded from disk once the horizon reaches it
+            self.pending.pop(key, None)
+
+    async def cancel(self, key: str) -> bool:
+        """
+        Delete a job, returns whether one was pending.
+        """
+        self.pending.pop(key, None)
+        cursor = await self.db.execute(
+            """
+            DELETE FROM jobs
+            WHERE key = ?
+            """,
+            (key,),
+        )
+        return cursor.rowcount > 0
+
+    def scheduled(self, key: str) -> bool:
+        return key in self.pending
+
+    def _place(self, job: Job) -> None:
+        self.pending[job.key] = job
+        self.wheel[max(job.run_at, self.cursor) % self.horizon].append(job)
+
+    async def _load(self, until: int) -> None:
+        rows = await self.db.fetchall(
+            """
+            SELECT id, kind, key, guild_id, payload, run_at, attempts
+            FROM jobs
+            WHERE run_at >= ?
+            AND run_at < ?
+            """,
+            (self.loaded_until, until),
+        )
+        for row in rows:
+            job = Job.from_row(tuple(row))
+            if job.key not in self.pending and (self.owns is None or self.owns(job.guild_id)):
+                self._place(job)
+
+        self.loaded_until = until
+
+    async def start(self) -> None:
+        """
+        Recover every job due within the horizon, overdue ones included,
+        and start ticking.
+        """
+        self.cursor = int(time())
+        await self._load(self.cursor + self.horizon)
+        self._task = asyncio.create_task(self._run(), name="scheduler")
+
+    async def _run(self) -> None:
+        if self.ready:
+            await self.ready()
+
+        while True:
+            now = int(time())
+            due: List[Job] = []
+            while self.cursor <= now:
+                index = self.cursor % self.horizon
+                slot, self.wheel[index] = self.wheel[index], []
+                due.extend(slot)
+
+                # anything placed while the batch runs lands on a later slot
+                self.cursor += 1
+
+            if due:
+                try:
+                    await self._drain(due)
+                except Exception:
+                    logger.exception("Failed to run scheduled jobs")
+
+            # pull in the next stretch once half the horizon has been used
+            if self.loaded_until - self.cursor < self.horizon // 2:
+                try:
+                    await self._load(self.cursor + self.horizon)
+                except Exception:
+                    logger.exception("Failed to load scheduled jobs")
+
+            await asyncio.sleep(max(0.0, self.cursor - time()))
+
+    async def _drain(self, jobs: List[Job]) -> None:
+        started = monotonic()
+        self.backlog = len(jobs)
+        limits: Dict[Optional[int], asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.concurrency)
+        )
+        finished: List[tuple[int, int]] = []
+
+        async def run(job: Job) -> None:
+            async with limits[job.guild_id]:
+                try:
+                    if await self._fire(job):
+                        finished.append((job.id, job.run_at))
+                finally:
+                    self.backlog -= 1
+
+        await asyncio.gather(*(run(job) for job in jobs))
+
+        if finished:
+            # run_at guards against deleting a job rescheduled while it ran
+            await self.db.executemany(
+                """
+                DELETE FROM jobs
+                WHERE id = ?
+                AND run_at = ?
+                """,
+                finished,
+            )
+
+        elapsed = monotonic() - started
+        self._stats["done"] += len(finished)
+        self._stats["busy"] += elapsed
+        stats = self.stats()
+        # a large backlog, such as after downtime, is worth seeing at the default level
+        logger.log(
+            logging.INFO if len(jobs) >= 100 else logging.DEBUG,
+            f"Drained {len(jobs)} scheduled jobs in {elapsed:.1f}s "
+            f"({len(finished) / elapsed if elapsed else 0:.1f}/s), "
+            f"{stats['scheduled']} scheduled, {stats['failed']} failed since start, "
+            f"{stats['rate']:.1f}/s overall",
+        )
+
+    async def _fire(self, job: Job) -> bool:
+        """
+        Run one job, returns True once its row can be deleted.
+        """
+        if self.pending.get(job.key) is not job:
+            return False
+
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            # the cog that owns this kind may not be loaded yet
+            previous, job.run_at = job.run_at, int(time()) + 60
+            await self.db.execute(
+                """
+                UPDATE jobs
+                SET run_at = ?
+                WHERE id = ?
+                AND run_at = ?
+                """,
+                (job.run_at, job.id, previous),
+            )
+            if self.pending.get(job.key) is job:
+                self._place(job)
+            return False
+
+        try:
+            await handler(job.payload)
+
+        except Exception:
+            logger.exception(f"Job {job.key} failed on attempt {job.attempts + 1}")
+            self._stats["failed"] += 1
+            await self._retry(job)
+            return False
+
+        if self.pending.get(job.key) is job:
+            del self.pending[job.key]
+        return True
+
+    async def _retry(self, job: Job) -> None:
+        previous = job.run_at
+        job.attempts += 1
+        if job.attempts >= MAX_ATTEMPTS:
+            logger.warning(f"Dropping job {job.key} after {job.attempts} attempts")
+            if self.pending.get(job.key) is job:
+                del self.pending[job.key]
+            await self.db.execute(
+                """
+                DELETE FROM jobs
+                WHERE id = ?
+                AND run_at = ?
+                """,
+                (job.id, previous),
+            )
+            return
+
+        job.run_at = int(time()) + min(30 * 2 ** job.attempts, self.horizon // 2)
+        await self.db.execute(
+            """
+            UPDATE jobs
+            SET run_at = ?, attempts = ?
+            WHERE id = ?
+            AND run_at = ?
+            """,
+            (job.run_at, job.attempts, job.id, previous),
+        )
+        if self.pending.get(job.key) is job:
+            self._place(job)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Jobs held in memory, the size of the batch being drained and
+        ``rate``, jobs finished per second of work.
+        """
+        return {
+            "scheduled": len(self.pending),
+            "backlog": self.backlog,
+            "done": self._stats["done"],
+            "failed": self._stats["failed"],
+            "rate": self._stats["done"] / self._stats["busy"] if self._stats["busy"] else 0.0,
+        }
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+        self.pending.clear()
+        self.wheel = [[] for _ in range(self.horizon)]
\ No newline at end of file
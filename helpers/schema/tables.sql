@@ -16,6 +16,9 @@ CREATE TABLE IF NOT EXISTS join_gate (
     age TEXT DEFAULT NULL,
     avatar INTEGER DEFAULT 0,
     action TEXT DEFAULT 'kick',
+    similar INTEGER DEFAULT 0,
+    duplicates INTEGER DEFAULT 0,
+    dry_run INTEGER DEFAULT 0,
     created_at TEXT DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -28,4 +31,86 @@ CREATE TABLE IF NOT EXISTS antinuke (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     PRIMARY KEY (guild_id, module)
+);
+
+CREATE TABLE IF NOT EXISTS antinuke_whitelist (
+    guild_id INTEGER NOT NULL,
+    target_id INTEGER NOT NULL,
+    type TEXT NOT NULL DEFAULT 'user',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (guild_id, target_id)
+);
+
+CREATE TABLE IF NOT EXISTS antinuke_policies (
+    guild_id INTEGER NOT NULL,
+    module TEXT NOT NULL,
+    threshold INTEGER NOT NULL,
+    punishment TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (guild_id, module, threshold)
+);
+
+CREATE TABLE IF NOT EXISTS join_raid (
+    guild_id INTEGER NOT NULL PRIMARY KEY,
+    joins INTEGER NOT NULL DEFAULT 10,
+    seconds INTEGER NOT NULL DEFAULT 10,
+    lockdown TEXT DEFAULT '10m',
+    action TEXT DEFAULT 'kick',
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS join_gate_log (
+    guild_id INTEGER NOT NULL,
+    joined_at INTEGER NOT NULL,
+    account_age INTEGER NOT NULL,
+    avatar INTEGER NOT NULL,
+    rule TEXT DEFAULT NULL,
+    dry_run INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS join_gate_log_guild_time ON join_gate_log (guild_id, joined_at);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL UNIQUE,
+    guild_id INTEGER DEFAULT NULL,
+    payload TEXT NOT NULL DEFAULT '{}',
+    run_at INTEGER NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS jobs_run_at ON jobs (run_at);
+
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    target_id INTEGER NOT NULL,
+    moderator_id INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    reason TEXT DEFAULT NULL,
+    created_at INTEGER NOT NULL,
+    expires_at INTEGER DEFAULT NULL
+);
+
+CREATE INDEX IF NOT EXISTS cases_guild_target ON cases (guild_id, target_id, id);
+
+CREATE TABLE IF NOT EXISTS restriction_roles (
+    guild_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    role_id INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, kind)
+);
+
+CREATE TABLE IF NOT EXISTS role_tasks (
+    guild_id INTEGER NOT NULL PRIMARY KEY,
+    role_id INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    selector TEXT NOT NULL,
+    channel_id INTEGER NOT NULL,
+    moderator_id INTEGER NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    started_at TEXT DEFAULT CURRENT_TIMESTAMP
 );
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""
+helpers/scripts/tracker_bench.py
+
+Compares memory and record() cost of the antinuke infraction trackers.
+
+    python -m helpers.scripts.tracker_bench
+"""
+
+from time import perf_counter
+
+import gc
+import tracemalloc
+
+from features.protection.tracker import TRACKERS
+
+KEYS = 1_000
+EVENTS = (1, 10, 100, 250)
+
+
+def measure(kind: str, events: int) -> tuple[int, float]:
+    """
+    Returns ``(bytes, ns_per_record)`` after recording *events* infractions
+    for each of ``KEYS`` keys.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    tracker = TRACKERS[kind]()
+    started = perf_counter()
+    for _ in range(events):
+        for guild_id in range(KEYS):
+            tracker.record(guild_id, "channels")
+    elapsed = perf_counter() - started
+
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return after - before, elapsed / (events * KEYS) * 1e9
+
+
+if __name__ == "__main__":
+    print(f"{'tracker':<10} {'events/key':>10} {'bytes/key':>10} {'ns/record':>10}")
+    for events in EVENTS:
+        for kind in TRACKERS:
+            size, cost = measure(kind, events)
+            print(f"{kind:<10} {events:>10} {size // KEYS:>10} {cost:>10.0f}")
@@ -1,14 +1,16 @@
 from bot import Bot
+from helpers.cluster import Launcher
 
 from os.path import join, dirname
 from dotenv import load_dotenv
 
 import os
 import logging
+import config
 
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
+    format='%(asctime)s - %(levelname)s - %(processName)s - %(name)s - %(message)s',
     handlers=[
         logging.FileHandler('logs/bot.log'),
         logging.StreamHandler()
@@ -22,5 +24,13 @@ load_dotenv(
 )
 
 if __name__ == "__main__":
-    bot = Bot()
-    bot.run(token=os.environ.get("BOT_TOKEN")) #type: ignore
+    if config.Settings.clusters > 1:
+        Launcher(
+            Bot,
+            os.environ.get("BOT_TOKEN"), #type: ignore
+            config.Settings.clusters,
+            config.Settings.shard_count,
+        ).run()
+    else:
+        bot = Bot(shard_count=config.Settings.shard_count)
+        bot.run(token=os.environ.get("BOT_TOKEN")) #type: ignore